@@ -0,0 +1,145 @@
+"""Time the parse, compute and write stages of an import on a synthetic capture.
+
+Parse and compute run in plain Python, no Blender needed:
+
+    python benchmarks/benchmark_import.py --vehicles 2 --frames 20000
+
+Run it through Blender to time the write stage as well, which imports every
+vehicle onto fresh dummies with Write Profile on and reads the F-Curve timings
+back from the profile:
+
+    blender --background --factory-startup --python benchmarks/benchmark_import.py -- --frames 20000
+
+Pass --capture to time an existing capture instead of a generated one.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from os import path, remove
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+sys.path.insert(0, path.dirname(path.abspath(__file__)))
+from mtasa_vehicle_motion_capture_tool import capture as capturemodule  # noqa: E402
+from mtasa_vehicle_motion_capture_tool.core import (  # noqa: E402
+    DEFAULT_WHEELS,
+    compute_vehicle,
+    compute_vehicles,
+)
+from mtasa_vehicle_motion_capture_tool.profiling import PROFILE_EXTENSION  # noqa: E402
+from synthetic_capture import write_capture  # noqa: E402
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+
+def best_of(repeat, function):
+    """Returns the fastest of repeat runs and the result of the last one."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def parse(filepath):
+    # Drop the cached index so every run scans the file again.
+    capturemodule.capture_cache.clear()
+    headers = capturemodule.get_capture(filepath)["headers"]
+    return [capturemodule.load_vehicle(filepath, index) for index in range(len(headers))]
+
+
+def compute(vehicles):
+    return [compute_vehicle(data, DEFAULT_WHEELS) for data in vehicles]
+
+
+def compute_parallel(filepath, count, workers):
+    tasks = [(index, DEFAULT_WHEELS) for index in range(count)]
+    return list(compute_vehicles(filepath, tasks, workers))
+
+
+def write(filepath, count):
+    """Imports every vehicle onto fresh dummies and returns the profile's phases."""
+    import mtasa_vehicle_motion_capture_tool as addon
+    addon.register()
+    scene = bpy.context.scene
+    props = scene.mta_vehmocap
+    props.bulk_import = True
+    props.profile_import = True
+    props.quiet_progress = True
+    phases = {}
+    for index in range(count):
+        veh = bpy.data.objects.new("vehicle", None)
+        scene.collection.objects.link(veh)
+        props.veh_dummy = veh
+        bpy.ops.object.mta_vehmocap(filepath=filepath, vehindex=index)
+        profilepath = filepath + PROFILE_EXTENSION
+        with open(profilepath) as profilefile:
+            report = json.load(profilefile)
+        remove(profilepath)
+        for name, phase in report["phases"].items():
+            phases[name] = phases.get(name, 0.0) + phase["seconds"]
+    return phases
+
+
+def print_stage(name, seconds, frames):
+    rate = frames / seconds if seconds > 0 else 0.0
+    print("  {:<24}{:>9.3f}s {:>12.0f} frames/s".format(name, seconds, rate))
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Benchmark the VehMocap import stages.")
+    parser.add_argument("--capture", help="existing capture to time instead of a synthetic one")
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--no-ped", action="store_true", help="leave the driver out")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the fastest is kept")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="also time parse and compute together in a process pool")
+    args = parser.parse_args(argv)
+
+    tempdir = None
+    filepath = args.capture
+    if filepath is None:
+        tempdir = tempfile.TemporaryDirectory()
+        filepath = write_capture(path.join(tempdir.name, "synthetic.json"),
+                                 args.vehicles, args.frames, not args.no_ped)
+    filepath = path.abspath(filepath)
+    try:
+        parse_time, vehicles = best_of(args.repeat, lambda: parse(filepath))
+        compute_time, computed = best_of(args.repeat, lambda: compute(vehicles))
+        frames = sum(len(result["frametimes"]) for result in computed if result is not None)
+        keyframes = sum(len(columns) * (len(indices) if indices is not None else len(result["frametimes"]))
+                        for result in computed if result is not None
+                        for _, _, indices, columns in result["channels"])
+        print("{}: {} vehicles, {} frames, {} keyframes, {:.1f} MB".format(
+            path.basename(filepath), len(vehicles), frames, keyframes,
+            path.getsize(filepath) / 1048576))
+        print_stage("parse", parse_time, frames)
+        print_stage("compute", compute_time, frames)
+        if args.workers > 1:
+            pool_time, _ = best_of(args.repeat, lambda: compute_parallel(filepath, len(vehicles), args.workers))
+            print_stage("parse+compute (-j " + str(args.workers) + ")", pool_time, frames)
+        if bpy is not None:
+            phases = write(filepath, len(vehicles))
+            print_stage("setup", sum(seconds for name, seconds in phases.items()
+                                     if name.startswith("setup/")), frames)
+            print_stage("write", sum(seconds for name, seconds in phases.items()
+                                     if name.startswith("write/")), frames)
+        else:
+            print("  write stage skipped, run through Blender to time it.")
+    finally:
+        if tempdir is not None:
+            tempdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Time the per-frame keyframe_insert() import against the bulk F-Curve writer.
+
+Run it through Blender, pointing it at a capture file:
+
+    blender --background --factory-startup --python benchmarks/compare_keyframe_writers.py -- capture.json [vehicle]
+
+Both imports run on fresh dummies in the same file, then every F-Curve they
+created is compared key by key.
+"""
+import re
+import sys
+import time
+from os import path
+
+import bpy
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+import mtasa_vehicle_motion_capture_tool as addon  # noqa: E402
+
+TOLERANCE = 1e-5
+
+
+def run_import(capture, vehindex, bulk):
+    scene = bpy.context.scene
+    veh = bpy.data.objects.new("vehicle", None)
+    scene.collection.objects.link(veh)
+    props = scene.mta_vehmocap
+    props.veh_dummy = veh
+    props.bulk_import = bulk
+    before = set(bpy.data.objects) | set(bpy.data.cameras)
+    start = time.perf_counter()
+    bpy.ops.object.mta_vehmocap(filepath=capture, vehindex=vehindex)
+    elapsed = time.perf_counter() - start
+    created = (set(bpy.data.objects) | set(bpy.data.cameras)) - before
+    return elapsed, collect_curves(created | {veh})
+
+
+def collect_curves(idblocks):
+    curves = {}
+    for idblock in idblocks:
+        if idblock.animation_data is None or idblock.animation_data.action is None:
+            continue
+        # The second import gets ".001" names, so match ids by their base name.
+        role = re.sub(r"\.\d{3}$", "", idblock.name)
+        for fcurve in idblock.animation_data.action.fcurves:
+            co = [0.0] * (len(fcurve.keyframe_points) * 2)
+            fcurve.keyframe_points.foreach_get("co", co)
+            curves[(role, fcurve.data_path, fcurve.array_index)] = co
+    return curves
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if not argv:
+        print(__doc__)
+        return
+    capture = path.abspath(argv[0])
+    vehindex = int(argv[1]) if len(argv) > 1 else 0
+    addon.register()
+    legacy_time, legacy = run_import(capture, vehindex, False)
+    bulk_time, bulk = run_import(capture, vehindex, True)
+    print()
+    print("keyframe_insert: {:.3f}s".format(legacy_time))
+    print("bulk writer:     {:.3f}s ({:.1f}x)".format(
+        bulk_time, legacy_time / bulk_time if bulk_time else 0.0))
+    mismatches = 0
+    for key in sorted(set(legacy) | set(bulk)):
+        a = legacy.get(key)
+        b = bulk.get(key)
+        if a is None or b is None or len(a) != len(b) or any(abs(x - y) > TOLERANCE for x, y in zip(a, b)):
+            mismatches += 1
+            print("Mismatch on", key)
+    print("{} F-Curves compared, {} mismatches.".format(
+        len(set(legacy) | set(bulk)), mismatches))
+
+
+if __name__ == "__main__":
+    main()
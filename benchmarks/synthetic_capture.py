@@ -0,0 +1,114 @@
+"""Generate synthetic VehMocap captures of any size for benchmarking.
+
+The captures follow the schema the importer reads: one object per vehicle
+with an "i" header and frames "1" to "fC", each holding the v/lf/rf/lb/rb
+components, the c camera, the P driver bones, fT, V and s. Vehicles drive
+around a circle with parked stretches in between, so headings wrap around
+and some channels hold still, the same as in real takes.
+
+    python benchmarks/synthetic_capture.py capture.json --vehicles 3 --frames 20000
+"""
+import argparse
+import json
+import random
+from math import cos, degrees, sin, tau
+
+KFPS = 50
+# Driver bones keyed with quaternions, then the ones keyed with Euler angles.
+QUATERNION_BONES = ("0", "1", "2", "3", "4", "5", "6", "7", "8",
+                    "21", "22", "23", "24", "25", "26",
+                    "31", "32", "33", "34", "35", "36",
+                    "41", "42", "43", "44", "51", "52", "53", "54")
+EULER_BONES = ("201", "301", "302")
+# Wheel dummy offsets from the vehicle, as (x, y, z).
+WHEEL_OFFSETS = {
+    "lf": (-0.85, 1.3, -0.3),
+    "rf": (0.85, 1.3, -0.3),
+    "lb": (-0.85, -1.3, -0.3),
+    "rb": (0.85, -1.3, -0.3),
+}
+
+
+def component(x, y, z, rx, ry, rz):
+    return {"pX": x, "pY": y, "pZ": z, "rX": rx, "rY": ry, "rZ": rz}
+
+
+def generate_vehicle(frames: int, withped: bool = True, model: str = "infernus", seed: int = 0):
+    """Returns one synthetic vehicle, header and frames, as the importer reads it."""
+    rand = random.Random(seed)
+    radius = rand.uniform(50.0, 200.0)
+    angle = rand.uniform(0.0, tau)
+    header = {"vN": model, "vT": "Automobile", "fC": frames, "kfPS": KFPS, "d": frames / KFPS}
+    if withped:
+        header["pM"] = "wmyst"
+    vehicle = {"i": header}
+    # Alternates between driving and parked stretches of a few seconds each.
+    speed = 0.0
+    stretch = 0
+    for keyframe in range(1, frames + 1):
+        if stretch <= 0:
+            stretch = rand.randint(2 * KFPS, 10 * KFPS)
+            speed = 0.0 if speed else rand.uniform(0.5, 1.5)
+        stretch -= 1
+        frametime = 1000.0 / KFPS + rand.uniform(-0.5, 0.5)
+        angle += speed * frametime / 1000.0 * 50.0 / radius
+        heading = degrees(angle) % 360.0
+        x, y = radius * cos(angle), radius * sin(angle)
+        frame = {
+            "v": component(x, y, 10.0, rand.uniform(-0.5, 0.5) * speed, 0.0, heading),
+            "fT": frametime,
+            "V": speed,
+            "s": 1,
+        }
+        for key, (offsetx, offsety, offsetz) in WHEEL_OFFSETS.items():
+            # Spin is rebuilt from the speed by the importer, rX only carries the rest.
+            steer = 15.0 * sin(keyframe / 40.0) if key in ("lf", "rf") else 0.0
+            frame[key] = component(offsetx, offsety, offsetz, 0.0, 0.0, steer)
+        frame["c"] = {
+            "cX": x - 6.0 * cos(angle), "cY": y - 6.0 * sin(angle), "cZ": 12.0,
+            "tX": x, "tY": y, "tZ": 10.0,
+            "r": 0.0, "fov": 70.0 + 10.0 * speed,
+        }
+        if withped:
+            bones = {"P": {"pX": -0.4, "pY": 0.0, "pZ": 0.5}}
+            for boneid in QUATERNION_BONES:
+                half = rand.uniform(-0.1, 0.1)
+                bones[boneid] = {"rW": cos(half), "rX": sin(half), "rY": 0.0, "rZ": 0.0,
+                                 "pX": 0.0, "pY": 0.0, "pZ": 0.1}
+            for boneid in EULER_BONES:
+                bones[boneid] = {"rX": rand.uniform(-5.0, 5.0), "rY": 0.0, "rZ": 0.0,
+                                 "pX": 0.0, "pY": 0.0, "pZ": 0.1}
+            frame["P"] = bones
+        vehicle[str(keyframe)] = frame
+    return vehicle
+
+
+def generate_capture(vehicles: int = 1, frames: int = 1000, withped: bool = True, seed: int = 0):
+    return [generate_vehicle(frames, withped, seed=seed + index) for index in range(vehicles)]
+
+
+def write_capture(outpath: str, vehicles: int = 1, frames: int = 1000, withped: bool = True, seed: int = 0):
+    """Writes a synthetic capture file, one vehicle at a time, and returns its path."""
+    with open(outpath, "w") as capturefile:
+        capturefile.write("[")
+        for index in range(vehicles):
+            if index:
+                capturefile.write(",")
+            json.dump(generate_vehicle(frames, withped, seed=seed + index), capturefile)
+        capturefile.write("]")
+    return outpath
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic VehMocap capture.")
+    parser.add_argument("outpath", help="capture file to write")
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--no-ped", action="store_true", help="leave the driver out")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(write_capture(args.outpath, args.vehicles, args.frames, not args.no_ped, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+bl_info = {
+    "name": "MTA:SA Vehicle Motion Capture Tool",
+    "author": "Matthew Chow <theportugueseplayer@gmail.com>",
+    "version": (0, 2, 0),
+    "blender": (2, 80, 0),
+    "location": "View3D > Sidebar > Animate Tab > MTA VehMocap Tool",
+    "description": "Parse the animation data from the JSON files generated by the Vehicle Motion Capture (VehMocap for short) resource for MTA:SA",
+    "doc_url": "https://github.com/ThePortuguesePlayer/VehMocap-Importer-For-Blender",
+    "category": "Animation",
+    "support": "COMMUNITY",
+}
+
+# Blender is only imported once the addon gets registered, so the capture
+# reading modules can also be used by plain Python.
+
+
+def register():
+    from . import addon
+    addon.register()
+
+
+def unregister():
+    from . import addon
+    addon.unregister()
@@ -0,0 +1,1844 @@
+from os import path
+from bpy.types import (
+    Operator,
+    Panel,
+    PropertyGroup,
+    Object,
+)
+from bpy.props import (
+    BoolProperty,
+    EnumProperty,
+    FloatProperty,
+    IntProperty,
+    PointerProperty,
+    StringProperty,
+)
+import bpy
+import json
+import multiprocessing
+import re
+from os import cpu_count
+from mathutils import Vector
+from math import radians, pi, floor, tan
+from datetime import timedelta
+from queue import Empty, Queue
+from threading import Event, Thread
+from time import perf_counter
+from .capture import (get_capture, get_capture_extension, get_sidecar, hash_frames, is_channels, load_vehicle,
+                      peek_capture)
+from .core import (
+    DECIMATE_ANGLE_TOLERANCE,
+    DECIMATE_POSITION_TOLERANCE,
+    GROUP_NAMES,
+    KEY_MERGE_THRESHOLD,
+    compute_vehicles,
+    frame_times,
+    get_capture_plan,
+    get_channel_group,
+    get_channel_plan,
+    get_frame_keys,
+    is_frame_valid,
+    merge_keys,
+)
+from .profiling import ImportProfile
+from .progress import ProgressReporter
+
+
+# Seconds between the modal import's timer events, and of work done on each.
+MODAL_TIMER_STEP = 0.02
+MODAL_TIME_SLICE = 0.05
+# Events the modal import lets through to Blender: looking around the viewport,
+# modifier keys and timers. Everything else, undo and deleting included, is
+# held back until the import is done, since it could pull objects out from
+# under it.
+MODAL_PASSTHROUGH_EVENTS = {
+    "MOUSEMOVE", "INBETWEEN_MOUSEMOVE", "MIDDLEMOUSE", "WHEELUPMOUSE", "WHEELDOWNMOUSE",
+    "TRACKPADPAN", "TRACKPADZOOM", "MOUSEROTATE", "MOUSESMARTZOOM", "NDOF_MOTION",
+    "LEFT_SHIFT", "RIGHT_SHIFT", "LEFT_CTRL", "RIGHT_CTRL", "LEFT_ALT", "RIGHT_ALT", "OSKEY",
+    "WINDOW_DEACTIVATE",
+}
+# Wheel radii by vehicle model and wheel meshes, shared by every import of a batch run (see batch.py).
+shared_wheelradii = None
+# Custom property on the vehicle dummy recording what was imported onto it.
+FINGERPRINT_PROPERTY = "vehmocap_import"
+# Custom property on every object the importer created, so none is ever taken for a vehicle dummy.
+CREATED_PROPERTY = "vehmocap_created"
+# Custom property on the vehicle dummy holding its model profile: wheel radii and dummies.
+PROFILE_PROPERTY = "vehmocap_model"
+# Dummies looked up under the vehicle dummy by name, per vehicle type, when none is picked.
+DUMMY_NAMES = {
+    "Automobile": {
+        "lf": "wheel_lf_dummy",
+        "rf": "wheel_rf_dummy",
+        "lb": "wheel_lb_dummy",
+        "rb": "wheel_rb_dummy",
+        "seat": "ped_frontseat",
+    },
+    "Bike": {
+        "lf": "wheel_front",
+        "lb": "wheel_rear",
+        "seat": "ped_frontseat",
+    },
+}
+DUMMY_NAMES["BMX"] = DUMMY_NAMES["Bike"]
+# Channel group toggles on MTAVEHMOCAP_Props, by core channel group.
+GROUP_PROPERTIES = {
+    "body": "import_body",
+    "wheels": "import_wheels",
+    "camera": "import_camera",
+    "driver": "import_driver",
+}
+# The operators' "groups" choices, the core channel groups in upper case.
+GROUP_ITEMS = [
+    ("BODY", "Body", "The vehicle dummy"),
+    ("WHEELS", "Wheels", "The wheel dummies"),
+    ("CAMERA", "Camera", "A camera rig following the captured camera"),
+    ("DRIVER", "Driver", "The driver armature"),
+]
+
+
+# Driver bone ids as captured -> names of the bones in GTA:SA ped armatures.
+PED_BONES = {
+    "0": "Root",
+    "1": " Pelvis",
+    "2": " Spine",
+    "3": " Spine1",
+    "4": " Neck",
+    "5": " Head",
+    "6": "L Brow",
+    "7": "R Brow",
+    "8": "Jaw",
+    "21": "Bip01 R Clavicle",
+    "22": " R UpperArm",
+    "23": " R ForeArm",
+    "24": " R Hand",
+    "25": " R Finger",
+    "26": "R Finger01",
+    "31": "Bip01 L Clavicle",
+    "32": " L UpperArm",
+    "33": " L ForeArm",
+    "34": " L Hand",
+    "35": " L Finger",
+    "36": "L Finger01",
+    "41": " L Thigh",
+    "42": " L Calf",
+    "43": " L Foot",
+    "44": " L Toe0",
+    "51": " R Thigh",
+    "52": " R Calf",
+    "53": " R Foot",
+    "54": " R Toe0",
+    "201": "Belly",
+    "301": "R breast",
+    "302": "L breast",
+}
+PED_BONE_IDS = {name: boneid for boneid, name in PED_BONES.items()}
+
+
+class FCurveBuffer:
+    """Holds every keyframe of an import in memory and writes each F-Curve in a single pass.
+
+    Replaces one keyframe_insert() call per channel per frame with one
+    keyframe_points.add() and one foreach_set() per F-Curve.
+    """
+
+    def __init__(self):
+        # (ID, data_path) -> [group, frames, one value list per array index]
+        self.series = {}
+        # (ID, data_path) -> [first, last] scene frame whose existing keys are removed first
+        self.replaced = {}
+
+    def add(self, idblock, data_path: str, values, frame: float, group: str = ""):
+        entry = self.series.get((idblock, data_path))
+        if entry is None:
+            entry = [group, [], [[] for _ in values]]
+            self.series[(idblock, data_path)] = entry
+        entry[1].append(frame)
+        for column, value in zip(entry[2], values):
+            column.append(value)
+
+    def add_series(self, idblock, data_path: str, frames, columns, group: str = "", replace: bool = False):
+        """Adds a whole channel at once, one column of values per array index.
+
+        With replace set, the keys the F-Curves already have from its first
+        to its last frame are removed before it is written, rather than
+        only the ones it has a key on the same frame for.
+        """
+        if replace and frames:
+            span = self.replaced.setdefault((idblock, data_path), [min(frames), max(frames)])
+            span[0] = min(span[0], min(frames))
+            span[1] = max(span[1], max(frames))
+        entry = self.series.get((idblock, data_path))
+        if entry is None:
+            self.series[(idblock, data_path)] = [group, list(frames), [list(column) for column in columns]]
+            return
+        entry[1].extend(frames)
+        for column, values in zip(entry[2], columns):
+            column.extend(values)
+
+    def keyframe_count(self):
+        return sum(len(entry[1]) * len(entry[2]) for entry in self.series.values())
+
+    def keyframe_counts(self):
+        """Returns {ID name: keyframes} for everything buffered."""
+        counts = {}
+        for (idblock, _), (_, frames, columns) in self.series.items():
+            counts[idblock.name] = counts.get(idblock.name, 0) + len(frames) * len(columns)
+        return counts
+
+    def write(self):
+        for _ in self.write_steps():
+            pass
+
+    def write_steps(self):
+        """Writes one F-Curve per step, yielding True in between, for imports that pause."""
+        series, self.series = self.series, {}
+        replaced, self.replaced = self.replaced, {}
+        for (idblock, data_path), (group, frames, columns) in series.items():
+            action = self.get_action(idblock)
+            span = replaced.get((idblock, data_path))
+            for index, values in enumerate(columns):
+                fcurve = action.fcurves.find(data_path, index=index)
+                if fcurve is None:
+                    fcurve = action.fcurves.new(
+                        data_path, index=index, action_group=group)
+                self.write_fcurve(fcurve, frames, values, span)
+                yield True
+
+    def get_action(self, idblock):
+        if idblock.animation_data is None:
+            idblock.animation_data_create()
+        if idblock.animation_data.action is None:
+            # Same name keyframe_insert() would have given it.
+            idblock.animation_data.action = bpy.data.actions.new(
+                idblock.name + "Action")
+        return idblock.animation_data.action
+
+    def write_fcurve(self, fcurve, frames, values, span=None):
+        points = fcurve.keyframe_points
+        existing = len(points)
+        co = [0.0] * (existing * 2)
+        if existing:
+            points.foreach_get("co", co)
+        if span is not None and existing:
+            first = span[0] - KEY_MERGE_THRESHOLD
+            last = span[1] + KEY_MERGE_THRESHOLD
+            co = [c for key in zip(co[0::2], co[1::2]) if not first < key[0] < last for c in key]
+            # Every key gets its coordinates set below, so which ones go doesn't matter.
+            while len(points) > len(co) // 2:
+                points.remove(points[-1], fast=True)
+            existing = len(points)
+        increasing = all(b - a >= KEY_MERGE_THRESHOLD for a, b in zip(frames, frames[1:]))
+        if increasing and (not existing or not frames or frames[0] - co[-2] >= KEY_MERGE_THRESHOLD):
+            # New keys all go after the existing ones, as on first imports and
+            # re-imports of longer captures.
+            co.extend(c for key in zip(frames, values) for c in key)
+        else:
+            # New keys replace the ones within a hundredth of a frame, like keyframe_insert() does.
+            co = merge_keys(co, frames, values)
+        points.add(len(co) // 2 - existing)
+        points.foreach_set("co", co)
+        # keyframe_points.add() creates Bezier keys with Auto Clamped handles,
+        # which only differs from keyframe_insert() if the user changed the defaults.
+        edit = bpy.context.preferences.edit
+        if edit.keyframe_new_interpolation_type != "BEZIER" or edit.keyframe_new_handle_type != "AUTO_CLAMPED":
+            for point in points:
+                point.interpolation = edit.keyframe_new_interpolation_type
+                point.handle_left_type = edit.keyframe_new_handle_type
+                point.handle_right_type = edit.keyframe_new_handle_type
+        fcurve.update()
+
+
+class ObjectIndex:
+    """Objects by name and children by parent, gathered in one pass over bpy.data.objects.
+
+    Object.children scans every object in the file each time it's read,
+    which adds up in scenes with thousands of objects. One index serves a
+    whole import, every vehicle in it included. Objects the import creates
+    go in with add(), and parents are changed through set_parent().
+    """
+
+    def __init__(self):
+        self.names = {}
+        # parent -> [children]
+        self.children = {}
+        for obj in bpy.data.objects:
+            self.add(obj)
+
+    def add(self, obj):
+        self.names[obj.name] = obj
+        if obj.parent is not None:
+            self.children.setdefault(obj.parent, []).append(obj)
+
+    def get(self, name: str):
+        return self.names.get(name)
+
+    def get_children(self, obj):
+        return self.children.get(obj, ())
+
+    def set_parent(self, obj, parent):
+        if obj.parent == parent:
+            return
+        if obj.parent is not None and obj in self.children.get(obj.parent, ()):
+            self.children[obj.parent].remove(obj)
+        obj.parent = parent
+        if parent is not None:
+            self.children.setdefault(parent, []).append(obj)
+
+
+class VehMocapImport:
+    """The import itself, shared by the operators below.
+
+    Kept out of the Operator classes, since Blender can't register an
+    operator that subclasses another registered one.
+    """
+
+    def run_import(self, context, modal=False, threaded=False):
+        """The whole import as a generator, yielding whenever it can pause.
+
+        execute() runs it to the end in one go, the modal operator a time
+        slice per timer event. Vehicles are computed, buffered and written
+        one at a time, and the fingerprint of each goes on its dummy straight
+        after its keys, so setting self.cancelled stops the import in between
+        two vehicles without leaving one half keyed. With threaded set, the
+        capture is read and the channels computed on a worker thread, leaving
+        only the bpy writes to the main thread. Yields False while waiting on
+        that thread, True otherwise.
+        """
+        scene = context.scene
+        props = scene.mta_vehmocap
+        self.profile = ImportProfile(props.profile_import)
+        self.threaded = threaded
+        self.result = {'CANCELLED'}
+        self.channelgroups = self.get_channel_groups(props)
+        if not self.channelgroups:
+            self.report({'WARNING'}, "Every channel group is turned off, nothing to import.")
+            return
+        filepath = self.filepath
+        with self.profile.phase("read"):
+            if props.binary_cache:
+                filepath = yield from self.in_background(get_sidecar, filepath, True)
+            capture = yield from self.in_background(get_capture, filepath)
+            headers = capture["headers"]
+        if self.cancelled:
+            return
+        if not self.importall and not 0 <= self.vehindex < len(headers):
+            self.report({'ERROR'}, "The capture has no vehicle {}, only {}.".format(self.vehindex + 1, len(headers)))
+            return
+        if self.importall:
+            targets = self.find_vehicle_targets(scene, headers)
+            if not targets:
+                self.report({'WARNING'}, "No vehicle in the scene matches the captured models.")
+                return
+        else:
+            targets = [(self.vehindex, {
+                "veh": props.veh_dummy,
+                "lf": props.wheel_lf_dummy,
+                "rf": props.wheel_rf_dummy,
+                "lb": props.wheel_lb_dummy,
+                "rb": props.wheel_rb_dummy,
+                "driver": props.driver_armature,
+            })]
+        if "driver" not in self.channelgroups:
+            for _, vehtargets in targets:
+                vehtargets["driver"] = None
+        self.fcurves = None
+        # Modal imports, precomputed channel files, ranges, resampled, decimated and pose bone keys
+        # can only be written in bulk.
+        if modal or props.bulk_import or props.import_range or props.resample or props.decimate or \
+                props.ped_direct or is_channels(filepath):
+            self.fcurves = FCurveBuffer()
+        self.cache_profiles = props.cache_profiles
+        # Wheel radii by vehicle model and wheel meshes seen during this import, or this batch run.
+        self.wheelradii = shared_wheelradii if shared_wheelradii is not None else {}
+        fpsscale = 1000 / scene.render.fps
+        wm = context.window_manager
+        imported = 0
+        wm.progress_begin(0, 100)
+        framerange = None
+        if props.import_range and props.range_unit == "SECONDS":
+            framerange = (props.range_start_time, props.range_end_time, True)
+        elif props.import_range:
+            framerange = (props.range_start_frame, props.range_end_frame, False)
+        self.progress = ProgressReporter(
+            sum(self.get_frame_count(headers[vehindex], framerange) for vehindex, _ in targets),
+            self.show_progress, props.quiet_progress or bpy.app.background or modal)
+        incremental = props.incremental and self.fcurves is not None
+        direct = props.ped_direct and self.fcurves is not None
+        with self.profile.phase("setup/index"):
+            self.objects = ObjectIndex()
+        with self.profile.phase("setup/plan"):
+            # Only the components the capture has get dummies, as only those get keys.
+            vehplans = [get_capture_plan(filepath, vehindex, self.channelgroups) for vehindex, _ in targets]
+        vehicles = [self.preparevehicle(headers[vehindex], vehtargets, vehplan, incremental, direct)
+                    for (vehindex, vehtargets), vehplan in zip(targets, vehplans)]
+        if self.fcurves is not None:
+            tolerances = None
+            if props.decimate:
+                tolerances = (props.decimate_position, props.decimate_angle)
+            resample = None
+            if props.resample:
+                resample = (fpsscale, props.resample_subframes)
+            settings = {"fpsscale": fpsscale, "resample": resample, "decimate": tolerances, "pedbones": direct,
+                        "groups": self.channelgroups}
+            plans = []
+            tasks = []
+            uptodate = 0
+            with self.profile.phase("setup/plan"):
+                for (vehindex, _), vehicle in zip(targets, vehicles):
+                    plan = self.planimport(filepath, vehindex, headers[vehindex], vehicle,
+                                           framerange, settings, scene.frame_current)
+                    if plan is None:
+                        uptodate += 1
+                        continue
+                    plans.append((vehicle, plan))
+                    tasks.append((vehindex, vehicle["wheels"], vehicle["driver"] is not None,
+                                  self.profile.enabled, tolerances, resample, plan["framerange"], vehicle["rig"],
+                                  self.channelgroups))
+            # Keyframes (values) before and after decimation.
+            decimated = [0, 0]
+            workers = 1
+            if props.parallel_compute:
+                workers = cpu_count() or 1
+                if bpy.app.version < (2, 91, 0):
+                    # sys.executable is the Blender binary itself before 2.91, so spawned
+                    # workers have to be pointed at its bundled Python.
+                    multiprocessing.set_executable(bpy.app.binary_path_python)
+            if threaded:
+                results = self.compute_in_background(filepath, tasks, workers)
+            else:
+                results = compute_vehicles(filepath, tasks, workers)
+            try:
+                for result in results:
+                    if self.cancelled:
+                        break
+                    if result is None:
+                        # Still computing on the worker thread.
+                        yield False
+                        continue
+                    index, computed = result
+                    if computed is not None:
+                        vehicle, plan = plans[index]
+                        self.profile.merge(computed.pop("profile", {}))
+                        if "keyframes" in computed:
+                            decimated[0] += computed["keyframes"][0]
+                            decimated[1] += computed["keyframes"][1]
+                        with self.profile.phase("write/buffer"):
+                            plan["fingerprint"]["end"] = self.writechannels(
+                                computed, vehicle, fpsscale, plan["start"], plan["rewrite"], plan["keep"],
+                                plan["replace"])
+                        self.progress.keyframes += self.fcurves.keyframe_count()
+                        for name, count in self.fcurves.keyframe_counts().items():
+                            self.profile.add_keyframes(name, count)
+                        writing = self.fcurves.write_steps()
+                        while True:
+                            with self.profile.phase("write/fcurves"):
+                                written = next(writing, False)
+                            if not written:
+                                break
+                            yield True
+                        vehicle["dummies"]["veh"][FINGERPRINT_PROPERTY] = json.dumps(plan["fingerprint"])
+                        vehicle["created"] = []
+                        self.progress.frames += len(computed["frametimes"])
+                        imported += 1
+                    self.progress.update(self.progress.frames)
+                    yield True
+            finally:
+                results.close()
+            if self.cancelled:
+                # Nothing records the objects made for vehicles never written, so they'd only pile up.
+                for vehicle, _ in plans:
+                    self.remove_created(vehicle)
+            if uptodate:
+                message = "{} vehicle(s) already up to date.".format(uptodate)
+                print(message)
+                self.report({'INFO'}, message)
+                imported += uptodate
+            if decimated[1]:
+                message = "Decimation kept {} of {} keyframes ({:.1f}:1).".format(
+                    decimated[1], decimated[0], decimated[0] / decimated[1])
+                print(message)
+                self.report({'INFO'}, message)
+        else:
+            for (vehindex, _), vehicle in zip(targets, vehicles):
+                # Keyed outside of what a fingerprint can describe, so only the
+                # objects created are recorded, which makes the next bulk import a full one.
+                vehicle["dummies"]["veh"][FINGERPRINT_PROPERTY] = json.dumps({"objects": vehicle["objects"]})
+                with self.profile.phase("decode"):
+                    data = load_vehicle(filepath, vehindex, get_frame_keys(self.channelgroups))
+                if self.is_frame_data_valid(data, "1"):
+                    with self.profile.phase("keyframes"):
+                        self.parseanimation(data, fpsscale, vehicle["dummies"], vehicle["camera"],
+                                            scene.frame_current, vehicle["wheelradius"], vehicle["driver"])
+                    imported += 1
+        self.progress.finish("Cancelled after" if self.cancelled else "Imported")
+        if self.cancelled:
+            self.report({'WARNING'}, "Import cancelled, {} of {} vehicle(s) imported.".format(imported, len(targets)))
+        if self.profile.enabled:
+            profilepath = self.profile.save(
+                self.filepath, vehicles=len(targets), frames=self.progress.frames,
+                bulk=self.fcurves is not None, parallel=bool(props.parallel_compute),
+                framerange=framerange, resample=bool(props.resample), decimate=bool(props.decimate),
+                groups=list(self.channelgroups))
+            print("Import profile written to " + profilepath)
+        wm.progress_end()
+        if imported:
+            self.result = {'FINISHED'}
+
+    def show_progress(self, progress: int):
+        bpy.context.window_manager.progress_update(progress)
+
+    def remove_created(self, vehicle):
+        """Removes the objects preparevehicle() created for a vehicle, and the driver constraints targeting them."""
+        created = set(vehicle["created"])
+        if not created:
+            return
+        if vehicle["armature"] is not None:
+            for posebone in vehicle["armature"].pose.bones:
+                for constraint in list(posebone.constraints):
+                    if getattr(constraint, "target", None) in created:
+                        posebone.constraints.remove(constraint)
+        for obj in vehicle["created"]:
+            data = obj.data
+            bpy.data.objects.remove(obj)
+            if data is not None and data.users == 0:
+                bpy.data.cameras.remove(data)
+        vehicle["created"] = []
+
+    def get_channel_groups(self, props):
+        """Returns the channel groups to import, in core.GROUP_NAMES order."""
+        if self.groups:
+            return tuple(group for group in GROUP_NAMES if group.upper() in self.groups)
+        return tuple(group for group in GROUP_NAMES if getattr(props, GROUP_PROPERTIES[group]))
+
+    def in_background(self, function, *args):
+        """Returns function(*args), called on a worker thread when the import is threaded.
+
+        Used with yield from, yielding until the thread is done.
+        """
+        if not self.threaded:
+            return function(*args)
+        outcome = []
+
+        def work():
+            try:
+                outcome.append((True, function(*args)))
+            except Exception as error:
+                outcome.append((False, error))
+        thread = Thread(target=work, daemon=True)
+        thread.start()
+        while not outcome:
+            yield False
+        succeeded, value = outcome[0]
+        if not succeeded:
+            raise value
+        return value
+
+    def compute_in_background(self, filepath, tasks, workers):
+        """core.compute_vehicles() on a worker thread.
+
+        Yields its results as they come in, and None while there's nothing
+        new. Closing it lets the thread stop after the vehicle it's on.
+        """
+        results = Queue()
+        stop = Event()
+
+        def work():
+            try:
+                for result in compute_vehicles(filepath, tasks, workers):
+                    results.put(result)
+                    if stop.is_set():
+                        break
+            except Exception as error:
+                results.put(error)
+            results.put(StopIteration())
+        Thread(target=work, daemon=True).start()
+        try:
+            while True:
+                try:
+                    result = results.get_nowait()
+                except Empty:
+                    yield None
+                    continue
+                if isinstance(result, StopIteration):
+                    return
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            stop.set()
+
+    def get_frame_count(self, info, framerange):
+        """Frames an import of one vehicle will go through, for the progress bar."""
+        count = info["fC"]
+        if framerange is None:
+            return count
+        start, end, bytime = framerange
+        if bytime:
+            start *= info["kfPS"]
+            end *= info["kfPS"]
+        return int(max(min(end, count) - max(start, 1) + 1, 0))
+
+    def preparevehicle(self, info, targets, plan, incremental=False, direct=False):
+        """Creates or finds every object one vehicle's animation goes on.
+
+        plan holds the channel plan entries the capture has components for,
+        see core.get_capture_plan(), and no dummy is made for the others. Only
+        objects of the channel groups being imported are looked for or
+        created. With incremental set, the objects recorded by the last import
+        onto the same dummy are reused rather than created again. With direct set, the
+        driver's pose bones are keyed themselves, see get_ped_rig(), instead
+        of empties the bones copy their transforms from.
+        """
+        vehdummy = targets["veh"]
+        # Objects created from here on, see remove_created().
+        self.created = []
+        previous = None
+        recorded = {}
+        if incremental:
+            previous = self.get_fingerprint(vehdummy)
+            if previous is not None:
+                recorded = previous.get("objects", {})
+        driver = None
+        root = None
+        if targets["driver"] and direct:
+            root = self.get_ped_root(targets["driver"], targets)
+            if root is None:
+                self.report({'WARNING'}, "The driver is parented into the vehicle, keying bone empties instead.")
+            else:
+                driver = {"parent": root}
+        if targets["driver"] and root is None:
+            with self.profile.phase("setup/create_ped"):
+                driver = self.create_ped(
+                    targets["driver"], info, vehdummy, recorded.get("driver"))
+        stored = self.get_model_profile(vehdummy, info["vN"])
+        with self.profile.phase("setup/get_dummy"):
+            dummies = {"veh": vehdummy}
+            for _, target, _ in plan:
+                if target == "veh":
+                    continue
+                # The panel only offers wheel pickers for automobiles.
+                picked = targets.get(target) if info["vT"] == "Automobile" else None
+                dummies[target] = self.get_dummy(picked or self.get_stored_dummy(
+                    stored, target, vehdummy), vehdummy, target, info["vT"])
+            if "driver" in self.channelgroups:
+                dummies["seat"] = self.get_dummy(self.get_stored_dummy(stored, "seat", vehdummy), vehdummy, "seat")
+        for dummy in dummies:
+            dummies[dummy].rotation_mode = "XYZ"
+        if targets["driver"]:
+            if targets["driver"].parent.type == "EMPTY":
+                targets["driver"].parent.rotation_mode = "XYZ"
+            else:
+                targets["driver"].rotation_mode = "XYZ"
+            for bone in targets["driver"].pose.bones:
+                if bone.name == "Belly" or bone.name == "R breast" or bone.name == "L breast" or ("rM" in info and info["rM"] == "E"):
+                    bone.rotation_mode = "ZYX"
+                else:
+                    bone.rotation_mode = "QUATERNION"
+        rig = None
+        if root is not None:
+            with self.profile.phase("setup/create_ped"):
+                rig = self.get_ped_rig(targets["driver"], root, info)
+        camera = None
+        if "camera" in self.channelgroups:
+            with self.profile.phase("setup/create_camera"):
+                camera = self.get_recorded_camera(recorded.get("camera"))
+                if camera is None:
+                    camera = self.create_camera(
+                        info["vN"] + "-" + str(info["fC"]), vehdummy)
+        # Wheel Radius defaults to 0.34 if no model is found.
+        # Measured once per vehicle model and wheel meshes for the whole import,
+        # and only again once the model profile stored on the dummy is out of date.
+        with self.profile.phase("setup/wheel_radius"):
+            meshes = self.get_wheel_meshes(dummies)
+            wheelradius = self.wheelradii.get((info["vN"], meshes))
+            if wheelradius is None and stored is not None and stored.get("meshes") == meshes:
+                wheelradius = stored["wheelradius"]
+            if wheelradius is None and not any(rule == "wheel" for _, _, rule in plan):
+                wheelradius = {"front": 0.34, "back": 0.34}
+            if wheelradius is None:
+                wheelradius = self.get_wheel_radius(dummies)
+        self.wheelradii[(info["vN"], meshes)] = wheelradius
+        # Without the wheels nothing was measured, so the stored profile is kept.
+        if self.cache_profiles and "wheels" in self.channelgroups:
+            profile = {
+                "model": info["vN"],
+                "meshes": meshes,
+                "wheelradius": wheelradius,
+                "dummies": {key: dummy.name for key, dummy in dummies.items() if key != "veh"},
+            }
+            if profile != stored:
+                vehdummy[PROFILE_PROPERTY] = json.dumps(profile)
+        wheels = {}
+        for _, target, rule in plan:
+            if rule == "wheel":
+                wheels[target] = (self.get_axle_radius(wheelradius, target), self.getwheelside(dummies[target]))
+        # Objects of groups left out this time are kept for the next import that has them.
+        objects = {key: names for key, names in recorded.items() if key not in self.channelgroups}
+        if camera is not None:
+            objects["camera"] = {key: camera[key].name for key in ("holder", "target", "camobj")}
+        if driver is not None and root is None:
+            objects["driver"] = {key: obj.name for key, obj in driver.items()}
+        return {
+            "dummies": dummies,
+            "camera": camera,
+            "driver": driver,
+            "armature": targets["driver"],
+            "rig": rig,
+            "wheelradius": wheelradius,
+            "wheels": wheels,
+            "previous": previous,
+            "objects": objects,
+            "created": self.created,
+        }
+
+    def get_model_profile(self, vehdummy, model: str):
+        """Returns what an earlier import stored about a vehicle dummy's model, if
+        it was the same model and profiles are in use."""
+        if not self.cache_profiles or PROFILE_PROPERTY not in vehdummy:
+            return None
+        try:
+            profile = json.loads(vehdummy[PROFILE_PROPERTY])
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(profile, dict) or profile.get("model") != model:
+            return None
+        return profile
+
+    def get_stored_dummy(self, profile, key: str, vehdummy):
+        """Returns the dummy a model profile recorded for key, if it's still under the vehicle."""
+        if profile is None or key not in profile.get("dummies", {}):
+            return ""
+        dummy = self.objects.get(profile["dummies"][key])
+        if dummy is None or dummy.parent != vehdummy:
+            return ""
+        return dummy
+
+    def get_wheel_meshes(self, dummies):
+        """Identifies what get_wheel_radius() measures, as a string: every object
+        under the wheel dummies with its scale and mesh, by name, vertex count
+        and sum of vertex coordinates. Reading these doesn't need the evaluated
+        bounding boxes dimensions does."""
+        meshes = []
+        for key in ("lf", "rf", "lb", "rb"):
+            if key not in dummies:
+                continue
+            for child in self.objects.get_children(dummies[key]):
+                entry = [key, child.name, [round(value, 6) for value in child.scale]]
+                if child.type == "MESH":
+                    coordinates = [0.0] * (len(child.data.vertices) * 3)
+                    child.data.vertices.foreach_get("co", coordinates)
+                    entry += [child.data.name, len(child.data.vertices), round(sum(coordinates), 4)]
+                meshes.append(entry)
+        return json.dumps(meshes)
+
+    def get_ped_root(self, armature, targets):
+        """Returns the topmost object above the driver armature, or None if
+        the armature is parented into the vehicle."""
+        root = armature
+        while root.parent is not None:
+            root = root.parent
+        if root == targets["veh"]:
+            return None
+        return root
+
+    def get_ped_rig(self, armature, root, info):
+        """Sets the driver up to be keyed bone by bone and describes its armature for core.pose_bone_channels().
+
+        The root object above the armature takes the place of the "fC"
+        empty: it's keyed with the driver's location, which is in world
+        space like the vehicle's, and keeps its own rotation. Copy Transforms constraints an
+        earlier import put on the bones are removed. Bones are listed parents
+        first with their rest transform, capture id and rotation mode.
+        """
+        prefix = info["pM"] + "_"
+        for posebone in armature.pose.bones:
+            for constraint in list(posebone.constraints):
+                if constraint.type == "COPY_TRANSFORMS" and constraint.target is not None and \
+                        constraint.target.name.startswith(prefix):
+                    posebone.constraints.remove(constraint)
+        rootbasis = root.matrix_basis.copy()
+        rootbasis.translation = Vector((0.0, 0.0, 0.0))
+        space = rootbasis @ root.matrix_world.inverted() @ armature.matrix_world
+        location, rotation, _ = space.decompose()
+        bones = []
+        positions = {}
+        pending = [bone for bone in armature.data.bones if bone.parent is None]
+        while pending:
+            bone = pending.pop(0)
+            positions[bone.name] = len(bones)
+            restlocation, restrotation, _ = bone.matrix_local.decompose()
+            bones.append({
+                "id": PED_BONE_IDS.get(bone.name),
+                "name": bone.name,
+                "parent": None if bone.parent is None else positions[bone.parent.name],
+                "rest": (tuple(restrotation), tuple(restlocation)),
+                "mode": armature.pose.bones[bone.name].rotation_mode,
+            })
+            pending.extend(bone.children)
+        return {"space": (tuple(rotation), tuple(location)), "bones": bones}
+
+    def get_fingerprint(self, vehdummy):
+        """Returns what the last bulk import recorded on a vehicle dummy, if anything."""
+        if FINGERPRINT_PROPERTY not in vehdummy:
+            return None
+        try:
+            return json.loads(vehdummy[FINGERPRINT_PROPERTY])
+        except (TypeError, ValueError):
+            return None
+
+    def get_recorded(self, names, key):
+        if not names or key not in names:
+            return None
+        return self.objects.get(names[key])
+
+    def get_recorded_camera(self, names):
+        """Returns the camera rig an earlier import created, if all of it is still there."""
+        camera = {key: self.get_recorded(names, key) for key in ("holder", "target", "camobj")}
+        if None in camera.values() or camera["camobj"].type != "CAMERA":
+            return None
+        camera["camera"] = camera["camobj"].data
+        return camera
+
+    def planimport(self, filepath, vehindex, info, vehicle, framerange, settings, start):
+        """Works out what importing one vehicle has to compute and write, or returns None if it's up to date.
+
+        A fingerprint of the import is kept on the vehicle dummy: the capture,
+        vehicle, range, settings, the digest of the frames imported and the
+        state of each channel group. If the last import onto the same dummy
+        used the same capture, vehicle, range and settings, and the frames it
+        imported are unchanged, only frames appended since then and channel
+        groups whose inputs (wheel radii, driver armature) changed are written.
+        Everything is written again once the objects it went on were
+        recreated or lost their F-Curves.
+
+        Returns the "framerange" to compute, the scene frame its first frame
+        goes on ("start"), the channel groups to write whole ("rewrite", None
+        for all of them), the position from which the other groups are written
+        ("keep"), the channel groups whose earlier keys over the imported frames
+        are removed first ("replace") and the "fingerprint" to record.
+        """
+        first = 1
+        if framerange is not None and not framerange[2]:
+            first = max(int(framerange[0]), 1)
+        count = self.get_frame_count(info, framerange)
+        armature = vehicle["armature"]
+        # Round-tripped so tuples compare equal to what was read back.
+        fingerprint = json.loads(json.dumps({
+            "file": path.abspath(filepath),
+            "vehindex": vehindex,
+            "range": framerange,
+            "start": start,
+            "settings": settings,
+            "groups": {
+                "body": None,
+                "wheels": vehicle["wheels"],
+                "camera": None,
+                "driver": armature.name if armature else None,
+            },
+            "objects": vehicle["objects"],
+            "frames": count,
+        }))
+        plan = {"framerange": framerange, "start": start, "rewrite": None, "keep": 0,
+                "replace": set(GROUP_NAMES), "fingerprint": fingerprint}
+        previous = vehicle["previous"]
+        # Frames can't be matched up across ranges given in seconds, and objects
+        # recreated since (the recorded ones were deleted) have no keys yet.
+        comparable = previous is not None and not (framerange is not None and framerange[2]) and all(
+            previous.get(key) == fingerprint[key] for key in ("file", "vehindex", "range", "start", "settings", "objects"))
+        if not comparable or previous.get("frames", count + 1) > count:
+            fingerprint["hash"] = hash_frames(filepath, vehindex, first, [count])[0]
+            return plan
+        before, fingerprint["hash"] = hash_frames(filepath, vehindex, first, [previous["frames"], count])
+        if before != previous.get("hash"):
+            return plan
+        changed = {group for group, state in fingerprint["groups"].items()
+                   if previous["groups"].get(group) != state}
+        if not self.has_animation(vehicle, changed):
+            # Keys of unchanged groups were removed since.
+            return plan
+        if not changed and previous["frames"] == count:
+            return None
+        if changed or settings["resample"] is not None or previous.get("end") is None:
+            # Resampled keys sit on a grid laid over the whole import.
+            if settings["resample"] is None:
+                plan["rewrite"] = changed
+                plan["keep"] = previous["frames"]
+                plan["replace"] = changed
+            return plan
+        # Only frames were appended: compute those, carrying on from the last ones.
+        plan["replace"] = set()
+        plan["framerange"] = (first + previous["frames"], first + count - 1, False)
+        plan["start"] = previous["end"]
+        return plan
+
+    def has_animation(self, vehicle, skip=()):
+        """Whether every object this import keys still has the F-Curves an earlier import gave it.
+
+        Channel groups in skip aren't checked.
+        """
+        expected = []
+        if "body" in self.channelgroups:
+            expected.append(("body", vehicle["dummies"]["veh"], "location"))
+        for target in vehicle["wheels"]:
+            expected.append(("wheels", vehicle["dummies"][target], "location"))
+        if vehicle["camera"] is not None:
+            camera = vehicle["camera"]
+            expected += [("camera", camera["holder"], "location"), ("camera", camera["target"], "location"),
+                         ("camera", camera["camobj"], "rotation_euler"), ("camera", camera["camera"], "lens")]
+        if vehicle["driver"] is not None:
+            expected.append(("driver", vehicle["driver"]["parent"], "location"))
+            if vehicle["rig"] is not None:
+                # Pose bone keys live on the armature's action.
+                expected.append(("driver", vehicle["armature"], None))
+        for group, idblock, data_path in expected:
+            if group in skip:
+                continue
+            animation = idblock.animation_data
+            if animation is None or animation.action is None or not animation.action.fcurves:
+                return False
+            if data_path is not None and animation.action.fcurves.find(data_path, index=0) is None:
+                return False
+        return True
+
+    def writechannels(self, computed, vehicle, fpsscale, start, rewrite=None, keep=0, replace=()):
+        """Hands channels from core.compute_vehicle() to the F-Curve buffer.
+
+        Channel groups missing from rewrite only get their keys from position
+        keep onwards. Channel groups in replace lose the keys they already had
+        over the frames written, so no key of an earlier import is left in
+        between. Returns the scene frame a following frame would go on.
+        """
+        end = None
+        if "times" in computed:
+            # Resampled channels index into an even grid of scene frames.
+            frametimes = [start + time for time in computed["times"]]
+        else:
+            frametimes = frame_times(computed["frametimes"], fpsscale, start)
+            if frametimes:
+                end = frametimes[-1] + (computed["frametimes"][-1] / fpsscale)
+        for target, data_path, indices, columns in computed["channels"]:
+            if rewrite is not None and get_channel_group(target) not in rewrite:
+                # Unchanged since the last import, apart from appended frames.
+                if indices is None:
+                    indices = range(len(frametimes))
+                kept = [position for position, index in enumerate(indices) if index >= keep]
+                if not kept:
+                    continue
+                indices = [indices[position] for position in kept]
+                columns = [[column[position] for position in kept] for column in columns]
+            times = frametimes
+            if indices is not None:
+                times = [frametimes[index] for index in indices]
+            group = "Object Transforms"
+            if target.startswith("bone:"):
+                idblock = vehicle["armature"]
+                group = target[5:]
+            elif target.startswith("ped:"):
+                boneid = target[4:]
+                idblock = vehicle["driver"]["parent" if boneid == "P" else boneid]
+            elif target == "camera":
+                idblock = vehicle["camera"]["camera"]
+                data_path = "lens"
+                group = ""
+                columns = [[self.getcameralens(idblock, fov) for fov in columns[0]]]
+            elif get_channel_group(target) == "camera":
+                idblock = vehicle["camera"][target]
+            else:
+                idblock = vehicle["dummies"][target]
+            self.fcurves.add_series(idblock, data_path, times, columns, group,
+                                    get_channel_group(target) in replace)
+        return end
+
+    def find_vehicle_targets(self, scene, headers):
+        """Pairs every captured vehicle with an unused vehicle dummy of the same model.
+
+        A dummy is any parentless empty in the scene whose own name, or the
+        name of its collection, matches the captured vN (ignoring case, ".dff"
+        and Blender's ".001" suffixes). Empties matching by their own name
+        come first. Objects the importer created, or that earlier imports
+        recorded on their dummies, are never picked. The driver armature is
+        the first armature found in the dummy's collection.
+        """
+        created = set()
+        for obj in scene.objects:
+            fingerprint = self.get_fingerprint(obj) if obj.type == "EMPTY" else None
+            if fingerprint is not None:
+                for names in fingerprint.get("objects", {}).values():
+                    created.update(names.values())
+        candidates = {}
+        for obj in scene.objects:
+            if obj.type != "EMPTY" or obj.parent is not None or CREATED_PROPERTY in obj or obj.name in created:
+                continue
+            # (0, name) for a match on its own name, (1, name) for one on its collection's.
+            names = {self.get_model_name(obj.name): 0}
+            if obj.users_collection:
+                names.setdefault(self.get_model_name(obj.users_collection[0].name), 1)
+            for name, rank in names.items():
+                candidates.setdefault(name, []).append(((rank, obj.name), obj))
+        used = set()
+        targets = []
+        for vehindex, header in enumerate(headers):
+            vehdummy = None
+            for _, obj in sorted(candidates.get(self.get_model_name(header["vN"]), []), key=lambda entry: entry[0]):
+                if obj not in used:
+                    vehdummy = obj
+                    break
+            if vehdummy is None:
+                print("No dummy found for vehicle " + str(vehindex + 1) + " (" + header["vN"] + ").")
+                continue
+            used.add(vehdummy)
+            driver = None
+            if "pM" in header and vehdummy.users_collection:
+                for obj in vehdummy.users_collection[0].objects:
+                    if obj.type == "ARMATURE":
+                        driver = obj
+                        break
+            targets.append((vehindex, {
+                "veh": vehdummy,
+                "lf": None,
+                "rf": None,
+                "lb": None,
+                "rb": None,
+                "driver": driver,
+            }))
+        return targets
+
+    def get_model_name(self, name: str):
+        name = re.sub(r"\.\d{3,}$", "", name).lower()
+        if name.endswith(".dff"):
+            name = name[:-4]
+        return name
+
+    def is_frame_data_valid(self, data, frame):
+        if frame is int:
+            frame = str(frame)
+        return is_frame_valid(data[frame])
+
+    def get_axle_radius(self, wheelradius, target: str):
+        if target[1] == "f":
+            return wheelradius["front"]
+        return wheelradius["back"]
+
+    def get_dummy(self, dummyname, vehdummy, key: str, vehtype: str = "Automobile"):
+        if not dummyname:
+            possibilities = DUMMY_NAMES.get(vehtype, DUMMY_NAMES["Automobile"])
+            dummyname = possibilities[key]
+            # Vehicles imported after the first get ".001" style names.
+            for child in self.objects.get_children(vehdummy):
+                if child.name.startswith(dummyname):
+                    return child
+        elif isinstance(dummyname, Object):
+            dummyname = dummyname.name
+        existing = self.objects.get(dummyname)
+        if existing is not None and existing.parent == vehdummy:
+            return existing
+        dummy = bpy.data.objects.new(dummyname, None)
+        vehdummy.users_collection[0].objects.link(
+            dummy)
+        dummy[CREATED_PROPERTY] = True
+        self.created.append(dummy)
+        if key == "bone":
+            dummy.empty_display_type = "ARROWS"
+            dummy.empty_display_size = 0.06
+        else:
+            dummy.empty_display_type = "CUBE"
+            dummy.empty_display_size = 0.05
+            dummy.parent = vehdummy
+        self.objects.add(dummy)
+        return dummy
+
+    def get_wheel_radius(self, dummies):
+        wheels = {}
+        for dummy in dummies:
+            if dummies[dummy]:
+                children = self.objects.get_children(dummies[dummy])
+                if len(children) == 1:
+                    wheels[dummy] = children[0]
+                    # print("Got to len() check #1")
+                elif dummy != "veh" and len(children) > 1:
+                    chosen = None
+                    size = 0.0
+                    for child in children:
+                        if abs(child.dimensions.y - child.dimensions.z) < 0.01 and child.dimensions.y > size:
+                            chosen = child
+                    wheels[dummy] = chosen
+        # print("Printing wheel objects found in dummies:")
+        # print(wheels)
+        if len(wheels) == 1:
+            # print("Found 1 wheel object")
+            for wheel in wheels:
+                if wheels[wheel].dimensions.y <= wheels[wheel].dimensions.z:
+                    size = wheels[wheel].dimensions.y * 0.5
+                    return {"front": size, "back": size}
+                else:
+                    size = wheels[wheel].dimensions.z * 0.5
+                    return {"front": size, "back": size}
+        elif len(wheels) > 1:
+            # print("Found " + str(len(wheels)) + " wheel objects")
+            sizes = {}
+            for wheel in wheels:
+                if wheel[1] == "f":
+                    if wheels[wheel].dimensions.y <= wheels[wheel].dimensions.z:
+                        sizes["front"] = wheels[wheel].dimensions.y * 0.5
+                    else:
+                        sizes["front"] = wheels[wheel].dimensions.z * 0.5
+                elif wheel[1] == "b":
+                    if wheels[wheel].dimensions.y <= wheels[wheel].dimensions.z:
+                        sizes["back"] = wheels[wheel].dimensions.y * 0.5
+                    else:
+                        sizes["back"] = wheels[wheel].dimensions.z * 0.5
+            return sizes
+        else:
+            print("Found no wheel objects. Radius set to the default of 0.34.")
+            return {"front": 0.34, "back": 0.34}
+
+    def parseanimation(self, data, fpsscale, dummies, camera, time, wheelradius, driverped=None):
+        length = data["i"]["fC"]
+        baseformat = {
+            "angle_offset_x": 0.0,
+            "angle_offset_y": 0.0,
+            "angle_offset_z": 0.0,
+            "x_history": 0.0,
+            "y_history": 0.0,
+            "z_history": 0.0,
+        }
+        rothistory = {
+            "position": [0.0, 0.0, 0.0],
+        }
+        # The channel plan, compiled into one writer per keyed component:
+        # (capture key, object, rotation history, wheel side, wheel radius).
+        writers = []
+        if "1" in data:
+            for key, target, rule in get_channel_plan(data["i"]["vT"], data["1"], self.channelgroups):
+                wheelside = None
+                if rule == "wheel":
+                    wheelside = self.getwheelside(dummies[target])
+                rothistory[target] = dict(baseformat)
+                writers.append((key, dummies[target], rothistory[target], wheelside,
+                                self.get_axle_radius(wheelradius, target)))
+        keyframe_counter = 1
+        if not self.progress.quiet:
+            print("There are " + str(length) + " keyframes to set.")
+        for _ in range(length):
+            self.progress.update(self.progress.frames + 1, " at " + str(time))
+            if str(keyframe_counter) in data:
+                framedata = data[str(keyframe_counter)]
+                self.setkeyframes(writers, framedata, time,
+                                  rothistory, camera, driverped)
+                self.progress.frames += 1
+                keyframe_counter += 1
+                if keyframe_counter <= length:
+                    time += (framedata["fT"] / fpsscale)
+
+    def create_ped(self, ped_armature, info, vehdummy, recorded=None):
+        allobjects = {}
+        allobjects["parent"] = self.get_recorded(recorded, "parent") or self.get_dummy(
+            info["pM"] + "_" + "fC", vehdummy, "bone")
+        for bone in PED_BONES:
+            bonename = info["pM"] + "_" + bone
+            allobjects[bone] = self.get_recorded(recorded, bone) or self.get_dummy(bonename, vehdummy, "bone")
+            self.objects.set_parent(allobjects[bone], allobjects["parent"])
+            self.add_constraint_to_bone(
+                ped_armature.pose.bones[self.getbonename(bone)],
+                allobjects[bone],
+                "COPY_TRANSFORMS",
+            )
+        return allobjects
+
+    def add_constraint_to_bone(self, bone, target, constraint: str):
+        # Re-imports onto the same empties would otherwise stack constraints.
+        for existing in bone.constraints:
+            if existing.type == constraint and existing.target == target:
+                return
+        bone.constraints.new(type=constraint).target = target
+
+    def create_camera(self, cam_name, vehdummy):
+        camera = bpy.data.cameras.new(cam_name)
+        camobj = bpy.data.objects.new(cam_name, camera)
+        vehdummy.users_collection[0].objects.link(
+            camobj)
+        target = bpy.data.objects.new("Target " + cam_name, None)
+        vehdummy.users_collection[0].objects.link(
+            target)
+        target.empty_display_type = "PLAIN_AXES"
+        target.empty_display_size = 0.35
+        holder = bpy.data.objects.new("Holder " + cam_name, None)
+        vehdummy.users_collection[0].objects.link(
+            holder)
+        holder.empty_display_type = "CUBE"
+        for obj in (camobj, target, holder):
+            obj[CREATED_PROPERTY] = True
+            self.objects.add(obj)
+        self.created += (camobj, target, holder)
+        self.objects.set_parent(camobj, holder)
+        holder.constraints.new(type="TRACK_TO")
+        holder.constraints["Track To"].target = target
+        return {
+            "camera": camera,
+            "camobj": camobj,
+            "holder": holder,
+            "target": target,
+        }
+
+    def setkeyframes(self, writers, framedata, attime, rothistory, camera, driver=None):
+        dist = self.getvehicletraveldistance(framedata)
+        for key, obj, hodict, wheelside, wheelradius in writers:
+            self.setcomponentkeyframe(framedata[key], obj, attime, hodict, rothistory["position"],
+                                      dist, wheelradius, wheelside)
+        if camera is not None:
+            self.setcamerakeyframe(camera, framedata, attime)
+        if "P" in framedata and driver:
+            self.setpedarmaturekeyframe(
+                framedata["P"], driver, attime)
+
+    def insertkeyframe(self, idblock, data_path: str, values, attime, group="Object Transforms"):
+        if self.fcurves is not None:
+            self.fcurves.add(idblock, data_path, values, attime, group)
+            return
+        # Single values (the camera lens) are plain floats, not arrays.
+        setattr(idblock, data_path, values[0] if len(values) == 1 else values)
+        idblock.keyframe_insert(data_path=data_path, frame=attime)
+        self.progress.keyframes += len(values)
+        self.profile.add_keyframes(idblock.name, len(values))
+
+    def setcamerakeyframe(self, camera, framedata, attime):
+        data = framedata["c"]
+        self.insertkeyframe(camera["holder"], "location",
+                            (data["cX"], data["cY"], data["cZ"]), attime)
+        self.insertkeyframe(camera["target"], "location",
+                            (data["tX"], data["tY"], data["tZ"]), attime)
+        self.insertkeyframe(camera["camobj"], "rotation_euler",
+                            (radians(0.0), radians(0.0), radians(data["r"])), attime)
+        self.insertkeyframe(camera["camera"], "lens",
+                            (self.getcameralens(camera["camera"], data["fov"]),), attime, "")
+
+    def getcameralens(self, camera, fov):
+        # Same conversion Blender does when Camera.angle is set.
+        sensor = camera.sensor_width
+        if camera.sensor_fit == "VERTICAL":
+            sensor = camera.sensor_height
+        return (sensor / 2.0) / tan(radians(fov) / 2.0)
+
+    def setcomponentkeyframe(self, framedata, obj, attime, hodict, lastpos, dist=0.0, wheelradius=0.34, wheelside=None):
+        # wheelside comes from getwheelside(), worked out once per import.
+        self.insertkeyframe(obj, "location",
+                            (framedata["pX"], framedata["pY"], framedata["pZ"]), attime)
+        rX = framedata["rX"]
+        rY = self.offsetrotationy(framedata["rY"], hodict)
+        rZ = self.offsetrotationz(framedata["rZ"], hodict)
+        if wheelside is not None:
+            rX = self.offsetrotationwheel(wheelside, rX, hodict, dist, wheelradius)
+        else:
+            rX = self.offsetrotationx(rX, hodict)
+        self.insertkeyframe(obj, "rotation_euler",
+                            (radians(rX), radians(rY), radians(rZ)), attime)
+
+    def getwheelside(self, obj):
+        # True for left wheels, False for right ones and None for anything that isn't a wheel.
+        if obj.name.startswith("wheel_l"):
+            return True
+        elif obj.name.startswith("wheel_r"):
+            return False
+        elif obj.name.startswith("wheel"):
+            return True
+        return None
+
+    def setpedarmaturekeyframe(self, framedata, objs, attime):
+        for boneid, k in framedata.items():
+            obj = None
+            if boneid == "P":
+                obj = objs["parent"]
+                # obj.rotation_euler = Euler(
+                #    (radians(k["rX"]), radians(k["rY"]), radians(k["rZ"])), "XYZ")
+                # obj.keyframe_insert(
+                #    data_path="rotation_euler", frame=attime)
+            else:
+                obj = objs[boneid]
+                if not "rW" in k:
+                    self.insertkeyframe(obj, "rotation_euler",
+                                        (k["rX"], k["rY"], k["rZ"]), attime)
+                else:
+                    self.insertkeyframe(obj, "rotation_quaternion",
+                                        (k["rW"], k["rX"], k["rY"], k["rZ"]), attime)
+            self.insertkeyframe(obj, "location",
+                                (k["pX"], k["pY"], k["pZ"]), attime)
+
+    def getvehicletraveldistance(self, framedata):
+        base = 0.02  # It's 1/50 seconds
+        velocity = None  # Distance traveled in 0.02 seconds.
+        if "V" in framedata:
+            velocity = framedata["V"]
+        else:
+            velocity = framedata["l"]
+        frametime = framedata["fT"] * 0.001  # Frame time converted to seconds.
+        # Returns distance traveled in [frametime].
+        return frametime * velocity / base
+
+    def offsetrotationz(self, val, dic):
+        lastval = dic["z_history"]
+        if (val + 90.0) < lastval:
+            dic["angle_offset_z"] += 360.0
+        elif (val - 90.0) > lastval:
+            dic["angle_offset_z"] -= 360.0
+        dic["z_history"] = val
+        return val + dic["angle_offset_z"]
+
+    def offsetrotationy(self, val, dic):
+        lastval = dic["y_history"]
+        if (val + 90.0) < lastval:
+            dic["angle_offset_y"] += 360.0
+        elif (val - 90.0) > lastval:
+            dic["angle_offset_y"] -= 360.0
+        dic["y_history"] = val
+        return val + dic["angle_offset_y"]
+
+    def offsetrotationx(self, val, dic):
+        lastval = dic["x_history"]
+        if (val + 180.0) < lastval:
+            dic["angle_offset_x"] += 360.0
+        elif (val - 180.0) > lastval:
+            dic["angle_offset_x"] -= 360.0
+        dic["x_history"] = val
+        return val + dic["angle_offset_x"]
+
+    def getwheelrotations(self, dist, radius):
+        circonference = 2 * pi * radius
+        return dist / circonference
+
+    def oldoffsetrotationwheel(self, val, dic, dist, wheelradius):
+        rotations = self.getwheelrotations(dist, wheelradius)
+        # tfr = rotations
+        lastval = dic["x_history"]
+        # This condition assumes the vehicle can't move fast enough in reverse to make a full wheel turn within a frame.
+        if abs(rotations) >= 1.0:
+            dic["angle_offset_x"] += (360.0 * floor(rotations))
+            rotations -= floor(rotations)
+        if (lastval + lastval*rotations) < val - 45:
+            dic["angle_offset_x"] -= 360.0
+        elif (lastval + lastval*rotations) > val + 45:
+            dic["angle_offset_x"] += 360.0
+        dic["x_history"] = val
+        # print([tfr, rotations, val, lastval, dic["x_history"]])
+        return val + dic["angle_offset_x"]
+
+    def offsetrotationwheel(self, isleftside, val, dic, dist, wheelradius):
+        rotations = self.getwheelrotations(dist, wheelradius)
+        lastval = dic["x_history"]
+        if abs(rotations) >= 1.0:
+            dic["angle_offset_x"] += (360.0 * floor(rotations))
+            rotations -= floor(rotations)
+        if dist >= 0:
+            if val > lastval:
+                dic["angle_offset_x"] += (val - lastval)
+            elif val < lastval:
+                dic["angle_offset_x"] += 360.0 + (val - lastval)
+        elif dist < 0:
+            if val > lastval:
+                dic["angle_offset_x"] -= (val - lastval)
+            elif val < lastval:
+                dic["angle_offset_x"] -= (360.0 + (val - lastval))
+        dic["x_history"] = val
+        if isleftside:
+            return dic["angle_offset_x"]
+        else:
+            return -dic["angle_offset_x"]
+
+    def getbonename(self, boneid):
+        return PED_BONES[boneid]
+
+
+class MTAVEHMOCAP_OT_RunAction(VehMocapImport, Operator):
+    bl_idname = "object.mta_vehmocap"
+    bl_label = "Parse JSON from VehMocap"
+    bl_description = "Get the animation from the selected VehMocap JSON file"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: StringProperty(subtype="FILE_PATH")
+    vehindex: IntProperty() = 0
+    importall: BoolProperty(default=False)
+    groups: EnumProperty(
+        name="Channel Groups",
+        description="Channel groups to import. The panel's toggles are used when none are given",
+        items=GROUP_ITEMS,
+        options={'ENUM_FLAG'},
+        default=set(),
+    )
+
+    def execute(self, context):
+        self.cancelled = False
+        for _ in self.run_import(context):
+            pass
+        return self.result
+
+
+class MTAVEHMOCAP_OT_ModalImport(VehMocapImport, Operator):
+    """The same import, run a time slice per timer event so Blender stays responsive.
+
+    The capture is read and computed on a worker thread, so no time slice
+    waits on it. Progress shows in the status bar. Esc stops the import once
+    the vehicle being written is done, keeping the vehicles imported so far.
+    Until then only viewport navigation reaches Blender.
+    """
+    bl_idname = "object.mta_vehmocap_modal"
+    bl_label = "Import VehMocap In Background"
+    bl_description = "Get the animation from the selected VehMocap JSON file while Blender stays responsive. Esc cancels"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: StringProperty(subtype="FILE_PATH")
+    vehindex: IntProperty() = 0
+    importall: BoolProperty(default=False)
+    groups: EnumProperty(
+        name="Channel Groups",
+        description="Channel groups to import. The panel's toggles are used when none are given",
+        items=GROUP_ITEMS,
+        options={'ENUM_FLAG'},
+        default=set(),
+    )
+
+    def invoke(self, context, event):
+        self.cancelled = False
+        self.steps = self.run_import(context, modal=True, threaded=True)
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(MODAL_TIMER_STEP, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == "ESC":
+            # run_import() picks this up before the next vehicle.
+            self.cancelled = True
+            context.workspace.status_text_set("VehMocap import: cancelling...")
+            return {'RUNNING_MODAL'}
+        if event.type != "TIMER":
+            if event.type in MODAL_PASSTHROUGH_EVENTS or event.type.startswith("TIMER"):
+                return {'PASS_THROUGH'}
+            return {'RUNNING_MODAL'}
+        deadline = perf_counter() + MODAL_TIME_SLICE
+        try:
+            while perf_counter() < deadline:
+                if not next(self.steps):
+                    # Waiting on the worker thread, hand the time back to Blender.
+                    break
+        except StopIteration:
+            self.stop(context)
+            return self.result
+        except Exception:
+            self.steps.close()
+            self.stop(context)
+            raise
+        return {'RUNNING_MODAL'}
+
+    def cancel(self, context):
+        self.steps.close()
+        self.stop(context)
+
+    def stop(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def show_progress(self, progress: int):
+        super().show_progress(progress)
+        text = "VehMocap import: {}%, Esc to cancel".format(progress)
+        if self.cancelled:
+            text = "VehMocap import: cancelling..."
+        bpy.context.workspace.status_text_set(text)
+
+
+class MTAVEHMOCAP_Props(PropertyGroup):
+
+    f_path: StringProperty(
+        name="JSON File",
+        subtype="FILE_PATH",
+        default="C:/Program Files (x86)/MTA San Andreas 1.5/mods/deathmatch/resources/vehmocap/captures/",
+        description="The JSON file, generated from the Vehicle Motion Capture MTA:SA resource, to process",
+    )
+    veh_index: IntProperty(
+        name="Select Vehicle",
+        description="Vehicle selection for when more than one vehicle was captured in a single file",
+        default=1,
+        # hard_min=1,
+    )
+    bulk_import: BoolProperty(
+        name="Bulk Import",
+        description="Compute every channel in memory first and write each F-Curve in one go. Much faster on long captures",
+        default=True,
+    )
+    parallel_compute: BoolProperty(
+        name="Parallel Compute",
+        description="Compute the channels of each vehicle in its own process when importing several vehicles at once",
+        default=False,
+    )
+    quiet_progress: BoolProperty(
+        name="Quiet Console",
+        description="Don't draw the progress bar in the system console, only a summary once the import is done. Always on in background mode",
+        default=False,
+    )
+    binary_cache: BoolProperty(
+        name="Binary Cache",
+        description="Convert the capture to a .vmcb file next to it on the first import, and read that instead on later imports of the same take",
+        default=False,
+    )
+    import_range: BoolProperty(
+        name="Import Range",
+        description="Only import part of the capture. Rotations and wheel spin still carry on from the frames before it",
+        default=False,
+    )
+    range_unit: EnumProperty(
+        name="Range In",
+        description="Whether the range is given in captured frames or in seconds",
+        items=[
+            ("FRAMES", "Frames", "Captured frame numbers, from 1"),
+            ("SECONDS", "Seconds", "Seconds from the start of the capture"),
+        ],
+        default="FRAMES",
+    )
+    range_start_frame: IntProperty(
+        name="First Frame",
+        description="First captured frame to import",
+        default=1,
+        min=1,
+    )
+    range_end_frame: IntProperty(
+        name="Last Frame",
+        description="Last captured frame to import",
+        default=1000,
+        min=1,
+    )
+    range_start_time: FloatProperty(
+        name="Start (s)",
+        description="Capture time of the first frame to import, in seconds",
+        default=0.0,
+        min=0.0,
+    )
+    range_end_time: FloatProperty(
+        name="End (s)",
+        description="Capture time of the last frame to import, in seconds",
+        default=20.0,
+        min=0.0,
+    )
+    incremental: BoolProperty(
+        name="Incremental Re-import",
+        description="When importing the same capture onto the same vehicle again, reuse its camera and driver empties and only write appended frames and channels whose wheels or driver changed",
+        default=True,
+    )
+    resample: BoolProperty(
+        name="Resample",
+        description="Key every channel on whole scene frames (or even subframes) instead of the capture's own frame times. Uses Bulk Import",
+        default=False,
+    )
+    resample_subframes: IntProperty(
+        name="Keys Per Frame",
+        description="Keys per scene frame when resampling",
+        default=1,
+        min=1,
+        max=16,
+    )
+    decimate: BoolProperty(
+        name="Decimate",
+        description="Drop keyframes that linear interpolation between their neighbours already reproduces within the tolerances below. Uses Bulk Import",
+        default=False,
+    )
+    decimate_position: FloatProperty(
+        name="Position Tolerance",
+        description="Largest location error a dropped keyframe may leave",
+        default=DECIMATE_POSITION_TOLERANCE,
+        min=0.0,
+        precision=4,
+        subtype="DISTANCE",
+    )
+    decimate_angle: FloatProperty(
+        name="Angle Tolerance",
+        description="Largest rotation or field of view error a dropped keyframe may leave, in degrees",
+        default=DECIMATE_ANGLE_TOLERANCE,
+        min=0.0,
+        precision=3,
+    )
+    background_import: BoolProperty(
+        name="Import In Background",
+        description="Import a little at a time so Blender stays responsive, with progress in the status bar. Esc cancels, keeping the vehicles already imported. Uses Bulk Import",
+        default=False,
+    )
+    cache_profiles: BoolProperty(
+        name="Remember Vehicle Models",
+        description="Store each vehicle's measured wheel radii and dummies on it, and reuse them on later imports until its wheel meshes change",
+        default=True,
+    )
+    ped_direct: BoolProperty(
+        name="Key Bones Directly",
+        description="Key the driver armature's pose bones instead of creating empties and Copy Transforms constraints for them. The armature's topmost parent is keyed with the driver's location. Uses Bulk Import",
+        default=False,
+    )
+    import_body: BoolProperty(
+        name="Body",
+        description="Animate the vehicle dummy",
+        default=True,
+    )
+    import_wheels: BoolProperty(
+        name="Wheels",
+        description="Animate the wheel dummies",
+        default=True,
+    )
+    import_camera: BoolProperty(
+        name="Camera",
+        description="Create a camera rig and animate it with the captured camera",
+        default=True,
+    )
+    import_driver: BoolProperty(
+        name="Driver",
+        description="Animate the driver armature",
+        default=True,
+    )
+    profile_import: BoolProperty(
+        name="Write Profile",
+        description="Time every import phase and count keyframes per object, saved as a .profile.json file next to the capture",
+        default=False,
+    )
+
+    def filterdummy(self, object):
+        return object.type == "EMPTY"
+    veh_dummy: PointerProperty(
+        name="Vehicle Dummy",
+        description="The object to be animated",
+        type=Object,
+        poll=filterdummy,
+    )
+
+    def filterarmature(self, object):
+        return object.type == "ARMATURE"
+    driver_armature: PointerProperty(
+        name="Driver Armature",
+        description="The armature object of the driver model",
+        type=Object,
+        poll=filterarmature,
+    )
+    wheel_lf_dummy: PointerProperty(
+        name="wheel_lf_dummy",
+        description="Select the Front-Left wheel object to animate",
+        type=Object,
+        poll=filterdummy,
+    )
+    wheel_rf_dummy: PointerProperty(
+        name="wheel_rf_dummy",
+        description="Select the Front-Right wheel object to animate",
+        type=Object,
+        poll=filterdummy,
+    )
+    wheel_lb_dummy: PointerProperty(
+        name="wheel_lb_dummy",
+        description="Select the Back-Left wheel object to animate",
+        type=Object,
+        poll=filterdummy,
+    )
+    wheel_rb_dummy: PointerProperty(
+        name="wheel_rb_dummy",
+        description="Select the Back-Right wheel object to animate",
+        type=Object,
+        poll=filterdummy,
+    )
+
+
+class MTAVEHMOCAP_PT_ui(Panel):
+    bl_label = "MTA VehMocap Tool"
+    bl_idname = "MTA_VEHMOCAP_PT_main"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Animate"
+    bl_context = "objectmode"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    file_path: str
+    file_vehname: list[str]
+    file_drivermodel: list[str]
+    file_vehtype: list[str]
+    file_nominalkfps: list[int]
+    file_duration: list[float]
+    file_framecount: list[int]
+
+    def draw(self, context):
+        layout = self.layout
+        # layout.use_property_split = True
+        layout.use_property_decorate = False
+        scene = context.scene
+
+        col = layout.column(align=True)
+        col.prop(scene.mta_vehmocap, "f_path")
+        self.update_panel(scene, col, layout)
+
+    def update_panel(self, scene, col, layout):
+        validated = self.validate_file(scene)
+        if validated == "VALIDATED":
+            box = col.box()
+            veh_count = len(self.file_vehname)
+            # The vehicle selector needs a better solution.
+            if veh_count > 1 or self.file_partial:
+                box.prop(scene.mta_vehmocap, "veh_index")
+                prop = box.operator(
+                    self.get_operator(scene), text="Import All Vehicles", icon="AUTO")
+                prop.filepath = self.file_path
+                prop.importall = True
+                box.prop(scene.mta_vehmocap, "parallel_compute")
+            index: int
+            if scene.mta_vehmocap.veh_index > veh_count:
+                index = veh_count - 1
+            elif scene.mta_vehmocap.veh_index <= 0:
+                index = 0
+            else:
+                index = scene.mta_vehmocap.veh_index - 1
+            # Vehicles past the ones peeked at are imported as picked, and checked against the full index then.
+            vehindex = index
+            if self.file_partial and scene.mta_vehmocap.veh_index > veh_count:
+                vehindex = scene.mta_vehmocap.veh_index - 1
+            sub = box.column(align=True)
+            if vehindex != index:
+                sub.label(text="Vehicle {} isn't listed yet, showing vehicle {}.".format(vehindex + 1, index + 1),
+                          icon="INFO")
+            infostring = self.get_info_string(index)
+            # Might need to improve this to make it look visually better.
+            for infoline in infostring.split("\n"):
+                row = sub.row(align=False)
+                row.alignment = 'CENTER'
+                row.label(text=infoline)
+            if self.file_partial:
+                sub.label(text="More vehicles may be listed once imported.", icon="INFO")
+            box = layout.box()
+            col = box.column(align=True)
+            col.prop(scene.mta_vehmocap, "veh_dummy")
+            if self.file_drivermodel[index] != "NONE":
+                col.prop(scene.mta_vehmocap, "driver_armature")
+            if scene.mta_vehmocap.veh_dummy and bpy.data.objects[scene.mta_vehmocap.veh_dummy.name]:
+                if self.file_vehtype[index] == "Automobile":
+                    col.prop(scene.mta_vehmocap, "wheel_lf_dummy")
+                    col.prop(scene.mta_vehmocap, "wheel_rf_dummy")
+                    col.prop(scene.mta_vehmocap, "wheel_lb_dummy")
+                    col.prop(scene.mta_vehmocap, "wheel_rb_dummy")
+                # Only spawning operator if at least the main object is selected.
+                if self.file_drivermodel[index] == "NONE" or not scene.mta_vehmocap.driver_armature or scene.mta_vehmocap.driver_armature.type == "ARMATURE":
+                    row = layout.row(align=True)
+                    row.prop(scene.mta_vehmocap, "import_body", toggle=True)
+                    row.prop(scene.mta_vehmocap, "import_wheels", toggle=True)
+                    row.prop(scene.mta_vehmocap, "import_camera", toggle=True)
+                    if self.file_drivermodel[index] != "NONE":
+                        row.prop(scene.mta_vehmocap, "import_driver", toggle=True)
+                    layout.prop(scene.mta_vehmocap, "bulk_import")
+                    layout.prop(scene.mta_vehmocap, "incremental")
+                    layout.prop(scene.mta_vehmocap, "import_range")
+                    if scene.mta_vehmocap.import_range:
+                        row = layout.row(align=True)
+                        row.prop(scene.mta_vehmocap, "range_unit", expand=True)
+                        row = layout.row(align=True)
+                        if scene.mta_vehmocap.range_unit == "SECONDS":
+                            row.prop(scene.mta_vehmocap, "range_start_time")
+                            row.prop(scene.mta_vehmocap, "range_end_time")
+                        else:
+                            row.prop(scene.mta_vehmocap, "range_start_frame")
+                            row.prop(scene.mta_vehmocap, "range_end_frame")
+                    layout.prop(scene.mta_vehmocap, "resample")
+                    if scene.mta_vehmocap.resample:
+                        layout.prop(scene.mta_vehmocap, "resample_subframes")
+                    layout.prop(scene.mta_vehmocap, "decimate")
+                    if scene.mta_vehmocap.decimate:
+                        layout.prop(scene.mta_vehmocap, "decimate_position")
+                        layout.prop(scene.mta_vehmocap, "decimate_angle")
+                    if self.file_drivermodel[index] != "NONE":
+                        layout.prop(scene.mta_vehmocap, "ped_direct")
+                    layout.prop(scene.mta_vehmocap, "cache_profiles")
+                    layout.prop(scene.mta_vehmocap, "binary_cache")
+                    layout.prop(scene.mta_vehmocap, "quiet_progress")
+                    layout.prop(scene.mta_vehmocap, "profile_import")
+                    layout.prop(scene.mta_vehmocap, "background_import")
+                    prop = layout.operator(
+                        self.get_operator(scene), text="Import Animation", icon="GRAPH")
+                    prop.filepath = self.file_path
+                    prop.vehindex = vehindex
+        else:
+            col.label(text=validated)
+
+    def get_operator(self, scene):
+        if scene.mta_vehmocap.background_import:
+            return MTAVEHMOCAP_OT_ModalImport.bl_idname
+        return MTAVEHMOCAP_OT_RunAction.bl_idname
+
+    def validate_file(self, scene):
+        abspath = bpy.path.abspath(scene.mta_vehmocap.f_path)
+        if path.isfile(abspath):
+            self.file_path = abspath
+            if get_capture_extension(abspath) in (".json", ".vmc", ".vmcb", ".vmcc"):
+                success = self.process_json_file()
+                if success:
+                    return "VALIDATED"
+                return "This is not a VehMocap JSON file."
+            return "This file type is not supported."
+        return "Select a JSON file to process."
+
+    def get_info_string(self, index: int):
+        infostring = "Vehicle: " + str(self.file_vehname[index]) + "\n"
+        if self.file_drivermodel[index] != "NONE":
+            infostring += "Driver model: " + \
+                self.file_drivermodel[index] + "\n"
+        infostring += \
+            "Keyframes Per Second: " + str(self.file_nominalkfps[index]) + "\n" + \
+            "Duration: " + str(timedelta(seconds=self.file_duration[index])).rstrip("0").replace(":", "{}").format("h ", "m ") + "s\n" + \
+            "Number of Keyframes: " + str(self.file_framecount[index])
+        return infostring
+
+    def process_json_file(self):
+        # Compressed captures are only partly read until they are imported.
+        capture = peek_capture(self.file_path)
+        self.file_partial = capture["partial"]
+        self.file_vehname = []
+        self.file_drivermodel = []
+        self.file_nominalkfps = []
+        self.file_framecount = []
+        self.file_duration = []
+        self.file_vehtype = []
+        has_data = False
+        for header in capture["headers"]:
+            self.file_vehname.append(header["vN"])
+            self.file_nominalkfps.append(header["kfPS"])
+            self.file_framecount.append(header["fC"])
+            self.file_duration.append(header["d"])
+            self.file_vehtype.append(header["vT"])
+            if "pM" in header:
+                self.file_drivermodel.append(header["pM"])
+            else:
+                self.file_drivermodel.append("NONE")
+            has_data = True
+        return has_data
+
+    def fetch_wheel_dummies(self, parentobj: str):
+        children = {}
+        for obj in bpy.data.objects[parentobj].children:
+            if obj.name[:14] == "wheel_lf_dummy":
+                children["lf"] = obj.name
+            elif obj.name[:14] == "wheel_rf_dummy":
+                children["rf"] = obj.name
+            elif obj.name[:14] == "wheel_lb_dummy":
+                children["lb"] = obj.name
+            elif obj.name[:14] == "wheel_rb_dummy":
+                children["rb"] = obj.name
+        return children
+
+
+classes = (
+    MTAVEHMOCAP_OT_RunAction,
+    MTAVEHMOCAP_OT_ModalImport,
+    MTAVEHMOCAP_PT_ui,
+    MTAVEHMOCAP_Props
+)
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.mta_vehmocap = PointerProperty(
+        type=MTAVEHMOCAP_Props)
+
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    del bpy.types.Scene.mta_vehmocap
+
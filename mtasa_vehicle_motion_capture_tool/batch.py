@@ -0,0 +1,147 @@
+"""Headless imports of whole job queues in one Blender process.
+
+    blender --background --python-exit-code 1 --python-expr "from mtasa_vehicle_motion_capture_tool import batch; batch.main()" -- jobs.json
+    python -m mtasa_vehicle_motion_capture_tool batch jobs.json --blender /path/to/blender
+
+A job file holds one job, or a list of them, as JSON:
+
+    {
+        "blend": "shots/sc010.blend",
+        "output": "shots/sc010_anim.blend",
+        "frame": 1,
+        "settings": {"bulk_import": true, "decimate": true},
+        "captures": [
+            {"file": "captures/take1.json", "all": true},
+            {"file": "captures/take2.json", "vehicles": [
+                {"index": 1, "vehicle": "infernus", "driver": "wmyst",
+                 "wheels": {"lf": "wheel_lf_dummy", "rf": "wheel_rf_dummy"}}
+            ]}
+        ]
+    }
+
+"blend" is opened first, if given, and the result saved to "output", or
+over the opened file. "settings" are panel properties (see
+addon.MTAVEHMOCAP_Props) and "frame" the scene frame imports start on.
+Captures either go onto every matching vehicle ("all", see Import All
+Vehicles) or onto vehicles named explicitly, by object name. "index" picks
+the captured vehicle, numbered from 1 like Select Vehicle in the panel and
+the info command list them, and defaults to the first. Wheels left
+out are found by name under the vehicle, as in the panel. Relative paths
+are relative to the job file.
+
+Capture indexes and measured wheel radii are kept for the whole queue, so
+a capture or vehicle model shared by several jobs is only looked at once.
+"""
+import json
+import sys
+from os import path
+
+import bpy
+
+from . import addon
+from .capture import get_capture
+
+# Keys of a vehicle's "wheels" entry.
+WHEEL_KEYS = ("lf", "rf", "lb", "rb")
+
+
+def get_object(name, objtype: str):
+    if name is None:
+        return None
+    obj = bpy.data.objects.get(name)
+    if obj is None or obj.type != objtype:
+        raise KeyError("No " + objtype.lower() + " object named " + name + ".")
+    return obj
+
+
+def import_capture(filepath: str, vehicles=None, importall: bool = False):
+    """Imports one capture into the open scene and returns how many imports finished.
+
+    vehicles is a list of {"index", "vehicle", "driver", "wheels"} entries
+    naming the objects to animate, or importall matches them by model.
+    """
+    if importall:
+        return int("FINISHED" in bpy.ops.object.mta_vehmocap(filepath=filepath, importall=True))
+    headers = get_capture(filepath)["headers"]
+    props = bpy.context.scene.mta_vehmocap
+    finished = 0
+    for vehicle in vehicles or ():
+        vehindex = vehicle.get("index", 1) - 1
+        if not 0 <= vehindex < len(headers):
+            raise KeyError("No vehicle " + str(vehindex + 1) + " in " + filepath + ".")
+        props.veh_dummy = get_object(vehicle["vehicle"], "EMPTY")
+        props.driver_armature = get_object(vehicle.get("driver"), "ARMATURE")
+        wheels = vehicle.get("wheels", {})
+        for key in WHEEL_KEYS:
+            setattr(props, "wheel_" + key + "_dummy", get_object(wheels.get(key), "EMPTY"))
+        finished += "FINISHED" in bpy.ops.object.mta_vehmocap(filepath=filepath, vehindex=vehindex)
+    return finished
+
+
+def run_job(job: dict, basedir: str = ""):
+    """Opens, imports and saves one job, returning the path it was saved to."""
+    if job.get("blend"):
+        bpy.ops.wm.open_mainfile(filepath=path.join(basedir, job["blend"]))
+        # Radii measured in another file may not fit this one's models.
+        addon.shared_wheelradii = {}
+    scene = bpy.context.scene
+    props = scene.mta_vehmocap
+    for name, value in job.get("settings", {}).items():
+        if name not in props.bl_rna.properties:
+            raise KeyError("Unknown setting " + name + ".")
+        setattr(props, name, value)
+    props.quiet_progress = True
+    if "frame" in job:
+        scene.frame_current = job["frame"]
+    for capture in job.get("captures", ()):
+        filepath = path.abspath(path.join(basedir, capture["file"]))
+        imported = import_capture(filepath, capture.get("vehicles"), capture.get("all", False))
+        print(filepath + ": " + str(imported) + " import(s) finished.")
+    outpath = job.get("output")
+    if outpath:
+        outpath = path.abspath(path.join(basedir, outpath))
+    else:
+        outpath = bpy.data.filepath
+    if not outpath:
+        raise ValueError("Job has no output and no .blend file to save over.")
+    bpy.ops.wm.save_as_mainfile(filepath=outpath)
+    return outpath
+
+
+def run_jobs(jobs, basedir: str = ""):
+    """Runs every job, carrying on past failed ones, and returns how many failed."""
+    if not hasattr(bpy.types.Scene, "mta_vehmocap"):
+        from . import register
+        register()
+    addon.shared_wheelradii = {}
+    failed = 0
+    try:
+        for number, job in enumerate(jobs, 1):
+            try:
+                print("Job " + str(number) + " saved to " + run_job(job, basedir))
+            except Exception as error:
+                # Bad settings raise TypeError and odd rigs AttributeError: none may stop the queue.
+                failed += 1
+                print("Job " + str(number) + " failed: " + type(error).__name__ + ": " + str(error))
+    finally:
+        addon.shared_wheelradii = None
+    return failed
+
+
+def main(argv=None):
+    """Runs the job files given after "--" on Blender's command line."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if not argv:
+        print("Usage: blender --background --python-exit-code 1 --python-expr "
+              "\"from mtasa_vehicle_motion_capture_tool import batch; batch.main()\" -- jobs.json [more.json ...]")
+        sys.exit(2)
+    failed = 0
+    for jobpath in argv:
+        with open(jobpath) as jobfile:
+            jobs = json.load(jobfile)
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+        failed += run_jobs(jobs, path.dirname(path.abspath(jobpath)))
+    if failed:
+        sys.exit(1)
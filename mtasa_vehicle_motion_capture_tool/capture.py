@@ -0,0 +1,809 @@
+"""Reading VehMocap capture files without Blender.
+
+A capture is a JSON array with one object per vehicle. Each vehicle holds an
+"i" header and one entry per frame, keyed "1" to "fC". Files are scanned
+through a memory map to find where every vehicle and frame starts and ends,
+so only the vehicle being imported is ever decoded, one frame at a time.
+
+JSON captures can be gzip or xz compressed (.json.gz, .vmc.gz, .json.xz).
+They are indexed in one pass over the decompressed stream, a chunk at a time,
+and reading a vehicle decompresses them again only up to the end of it,
+keeping just that vehicle in memory.
+
+Captures can also be converted to the .vmcb binary format, which stores every
+channel as a column of doubles that is read straight from a memory map.
+"""
+from os import path, stat
+from array import array
+from collections import OrderedDict
+from math import nan
+import gzip
+import hashlib
+import json
+import lzma
+import mmap
+import re
+import struct
+import sys
+
+# Parsed capture files, most recently used last. Keyed on the absolute path,
+# each entry remembers the modification time and size it was parsed at.
+CAPTURE_CACHE_SIZE = 4
+capture_cache = OrderedDict()
+
+# A whole string (escapes included) or a single bracket. Everything else is
+# skipped by the regex engine, so commas, numbers and whitespace cost nothing.
+TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+COLON = re.compile(rb'\s*:\s*')
+# TOKEN, or a lone quote: a string cut off by the end of what was read so far.
+STREAM_TOKEN = re.compile(TOKEN.pattern + rb'|"')
+SPACES = re.compile(rb'\s*')
+# An "i" member holding an object. The regex engine finds its literal start in
+# a memory search, so headers are picked out without tokenizing the frames.
+HEADER_MEMBER = re.compile(rb'"i"\s*:\s*(?=\{)')
+BACKSLASH = ord("\\")
+QUOTE = ord('"')
+OPENERS = (ord('{'), ord('['))
+OPEN_BRACE = ord('{')
+# Frame members read for frames before an import range: everything but the
+# driver, which is most of a frame. None of these keys occur inside the driver.
+LEAD_KEYS = ("v", "lf", "rf", "lb", "rb", "c", "fT", "V", "l", "s")
+DECODER = json.JSONDecoder()
+
+
+def scan(buffer, start=0, end=None, depth=0):
+    """Yields ("member", key, start, end) for every object inside a vehicle,
+    and ("vehicle", None, start, end) once each vehicle has been closed.
+
+    Offsets are byte offsets into buffer. Depth 1 is the top-level array and
+    depth 2 the inside of a vehicle.
+    """
+    if end is None:
+        end = len(buffer)
+    key = None
+    value_start = 0
+    vehicle_start = None
+    for match in TOKEN.finditer(buffer, start, end):
+        position = match.start()
+        char = buffer[position]
+        if char == QUOTE:
+            if depth == 2:
+                colon = COLON.match(buffer, match.end())
+                if colon is not None:
+                    key = match.group()
+                    value_start = colon.end()
+        elif char in OPENERS:
+            depth += 1
+            if depth == 2 and char == OPEN_BRACE:
+                vehicle_start = position
+                key = None
+        else:
+            depth -= 1
+            if depth == 2 and key is not None:
+                yield "member", json.loads(key), value_start, position + 1
+                key = None
+            elif depth == 1 and vehicle_start is not None:
+                yield "vehicle", None, vehicle_start, position + 1
+                vehicle_start = None
+
+
+def index_capture(buffer):
+    """Returns the header and byte range of every vehicle in a capture.
+
+    The byte ranges of each vehicle's frames are kept as well, under
+    "frames" (their keys) and "offsets" (start and end of each one in turn),
+    so loading a vehicle doesn't need to scan it again.
+    """
+    vehicles = []
+    if not buffer[:64].lstrip().startswith(b"["):
+        return vehicles
+    header = None
+    keys = []
+    offsets = array("q")
+    for kind, key, start, end in scan(buffer):
+        if kind == "member":
+            if key == "i":
+                header = json.loads(buffer[start:end])
+            else:
+                keys.append(key)
+                offsets.append(start)
+                offsets.append(end)
+        else:
+            if header is not None:
+                vehicles.append({"header": header, "start": start, "end": end,
+                                 "frames": keys, "offsets": offsets})
+            header = None
+            keys = []
+            offsets = array("q")
+    return vehicles
+
+
+def find_value_end(buffer, start: int):
+    """Returns the end of the JSON object or array starting at start, or None if buffer ends first."""
+    depth = 0
+    for match in STREAM_TOKEN.finditer(buffer, start):
+        char = buffer[match.start()]
+        if char == QUOTE:
+            if match.end() - match.start() == 1:
+                # A string cut off by the end of buffer.
+                return None
+        elif char in OPENERS:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return None
+
+
+def scan_headers(buffer):
+    """Returns the "i" header of every vehicle in a capture, without indexing any frames.
+
+    Frames have no "i" members, and a quote preceded by a backslash is
+    inside a string, so every other "i" key is a vehicle header. Stops at a
+    header cut off by the end of buffer, as in the start of a compressed capture.
+    """
+    headers = []
+    if not buffer[:64].lstrip().startswith(b"["):
+        return headers
+    for match in HEADER_MEMBER.finditer(buffer):
+        if match.start() and buffer[match.start() - 1] == BACKSLASH:
+            continue
+        end = find_value_end(buffer, match.end())
+        if end is None:
+            break
+        headers.append(json.loads(buffer[match.end():end]))
+    return headers
+
+
+# Compressed capture openers, by extension.
+COMPRESSED_OPENERS = {".gz": gzip.open, ".xz": lzma.open}
+# Errors a damaged or mislabelled compressed capture raises.
+COMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError)
+DECOMPRESS_CHUNK = 1 << 20
+# How much of a compressed capture peek_capture() decompresses.
+PEEK_SIZE = 1 << 16
+# peek_capture() results by path, as ((mtime, size), result).
+peek_cache = {}
+
+
+class CaptureBuffer(bytearray):
+    """Part of a decompressed capture, usable wherever the memory map of a capture file is.
+
+    Closing it releases its memory, like unmapping a file would.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self.clear()
+
+
+def is_compressed(filepath: str):
+    return path.splitext(filepath.lower())[1] in COMPRESSED_OPENERS
+
+
+def get_capture_extension(filepath: str):
+    """Returns the extension of a capture file, without any compression one (".json" for "take.json.gz")."""
+    root, extension = path.splitext(filepath.lower())
+    if extension in COMPRESSED_OPENERS:
+        extension = path.splitext(root)[1]
+    return extension
+
+
+def open_compressed(filepath: str):
+    return COMPRESSED_OPENERS[path.splitext(filepath.lower())[1]](filepath, "rb")
+
+
+def decompress(filepath: str, limit=None, start=0):
+    """Decompresses a capture from byte start up to byte limit (its end by default), one chunk at a time.
+
+    The bytes before start are decompressed too, but thrown away as they go.
+    """
+    buffer = CaptureBuffer()
+    with open_compressed(filepath) as stream:
+        stream.seek(start)
+        while limit is None or start + len(buffer) < limit:
+            size = DECOMPRESS_CHUNK if limit is None else min(DECOMPRESS_CHUNK, limit - start - len(buffer))
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            buffer += chunk
+    return buffer
+
+
+def index_stream(stream):
+    """index_capture() for a capture read from a stream, such as a decompressing one.
+
+    The stream is scanned a chunk at a time, in one pass, with the same rules
+    as scan(). Only the bytes not scanned yet and the "i" header being read
+    are held, never the whole capture. Offsets are from the start of the stream.
+    """
+    vehicles = []
+    window = bytearray()
+    while len(window) < 64:
+        chunk = stream.read(DECOMPRESS_CHUNK)
+        if not chunk:
+            break
+        window += chunk
+    if not window[:64].lstrip().startswith(b"["):
+        return vehicles
+    # Stream offsets of window[0] and of where scanning goes on from.
+    base = 0
+    resume = 0
+    depth = 0
+    key = None
+    value_start = 0
+    vehicle_start = None
+    header = None
+    keys = []
+    offsets = array("q")
+    while True:
+        chunk = stream.read(DECOMPRESS_CHUNK)
+        window += chunk
+        scanned = resume - base
+        for match in STREAM_TOKEN.finditer(window, scanned):
+            position = match.start()
+            char = window[position]
+            if char == QUOTE:
+                if match.end() - position == 1:
+                    if chunk:
+                        # Scanned again once the rest of the string has been read.
+                        break
+                    continue
+                if depth == 2:
+                    colon = COLON.match(window, match.end())
+                    if chunk and (colon or SPACES.match(window, match.end())).end() == len(window):
+                        # What follows the string, a colon or not, hasn't been read yet.
+                        break
+                    if colon is not None:
+                        key = match.group()
+                        value_start = base + colon.end()
+            elif char in OPENERS:
+                depth += 1
+                if depth == 2 and char == OPEN_BRACE:
+                    vehicle_start = base + position
+                    key = None
+            else:
+                depth -= 1
+                if depth == 2 and key is not None:
+                    if key == b'"i"':
+                        header = json.loads(window[value_start - base:position + 1])
+                    else:
+                        keys.append(json.loads(key))
+                        offsets.append(value_start)
+                        offsets.append(base + position + 1)
+                    key = None
+                elif depth == 1 and vehicle_start is not None:
+                    if header is not None:
+                        vehicles.append({"header": header, "start": vehicle_start, "end": base + position + 1,
+                                         "frames": keys, "offsets": offsets})
+                    vehicle_start = None
+                    header = None
+                    keys = []
+                    offsets = array("q")
+            scanned = match.end()
+        else:
+            if not chunk:
+                return vehicles
+            scanned = len(window)
+        keep = scanned
+        if key == b'"i"':
+            keep = min(keep, value_start - base)
+        del window[:keep]
+        base += keep
+        resume = base + scanned - keep
+
+
+def open_buffer(filepath: str):
+    with open(filepath, "rb") as capturefile:
+        return mmap.mmap(capturefile.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def open_vehicle(filepath: str, vehicle):
+    """Returns a buffer holding one indexed vehicle of a JSON capture, and the offset of its first byte.
+
+    Uncompressed captures are mapped whole. Compressed ones are decompressed
+    up to the end of the vehicle, and only the vehicle itself is kept.
+    """
+    if not is_compressed(filepath):
+        return open_buffer(filepath), 0
+    return decompress(filepath, vehicle["end"], vehicle["start"]), vehicle["start"]
+
+
+def peek_capture(filepath: str):
+    """Returns the "headers" of a capture as cheaply as it can, for display.
+
+    Captures that haven't been indexed yet only have their headers picked
+    out with scan_headers(), leaving the frame offsets to get_capture() at
+    import time. Compressed ones are only decompressed up to PEEK_SIZE,
+    giving the headers of the vehicles that start in it, and "partial" is
+    then set if more vehicles may follow.
+    """
+    filestat = stat(filepath)
+    stamp = (filestat.st_mtime_ns, filestat.st_size)
+    entry = capture_cache.get(filepath)
+    if is_binary(filepath) or is_channels(filepath) or (entry is not None and entry["stamp"] == stamp):
+        # Binary captures keep their headers in the directory up front.
+        return {"headers": get_capture(filepath)["headers"], "partial": False}
+    peeked = peek_cache.get(filepath)
+    if peeked is not None and peeked[0] == stamp:
+        return peeked[1]
+    headers = []
+    partial = False
+    try:
+        if is_compressed(filepath):
+            with decompress(filepath, PEEK_SIZE) as buffer:
+                headers = scan_headers(buffer)
+                partial = len(buffer) >= PEEK_SIZE
+        else:
+            with open_buffer(filepath) as buffer:
+                headers = scan_headers(buffer)
+    except COMPRESSION_ERRORS + (ValueError,):
+        headers = []
+    result = {"headers": headers, "partial": partial}
+    peek_cache.clear()
+    peek_cache[filepath] = (stamp, result)
+    return result
+
+
+def get_capture(filepath: str):
+    """Returns the cached index of a capture file, scanning it again only if it changed on disk.
+
+    The entry holds "headers", the "i" header of every vehicle, and "vehicles",
+    their byte ranges.
+    """
+    filestat = stat(filepath)
+    stamp = (filestat.st_mtime_ns, filestat.st_size)
+    entry = capture_cache.get(filepath)
+    if entry is not None and entry["stamp"] == stamp:
+        capture_cache.move_to_end(filepath)
+        return entry
+    try:
+        if is_binary(filepath) or is_channels(filepath):
+            magic = BINARY_MAGIC if is_binary(filepath) else CHANNELS_MAGIC
+            directory, buffer = read_binary(filepath, magic)
+            buffer.close()
+            vehicles = [{"header": vehicle["header"]}
+                        for vehicle in directory["vehicles"]]
+        elif is_compressed(filepath):
+            with open_compressed(filepath) as stream:
+                vehicles = index_stream(stream)
+        else:
+            with open_buffer(filepath) as buffer:
+                vehicles = index_capture(buffer)
+    except (ValueError, struct.error) + COMPRESSION_ERRORS:
+        # Empty files can't be mapped, broken headers can't be decoded and
+        # damaged compressed files can't be decompressed.
+        vehicles = []
+    entry = {
+        "stamp": stamp,
+        "headers": [vehicle["header"] for vehicle in vehicles],
+        "vehicles": vehicles,
+    }
+    capture_cache[filepath] = entry
+    capture_cache.move_to_end(filepath)
+    while len(capture_cache) > CAPTURE_CACHE_SIZE:
+        capture_cache.popitem(last=False)
+    return entry
+
+
+def iter_frames(filepath: str, index: int):
+    """Yields (key, frame) for every frame of one vehicle, decoding them one at a time."""
+    if is_binary(filepath):
+        yield from iter_binary_frames(filepath, index)
+        return
+    vehicle = get_capture(filepath)["vehicles"][index]
+    offsets = vehicle["offsets"]
+    buffer, base = open_vehicle(filepath, vehicle)
+    with buffer:
+        for position, key in enumerate(vehicle["frames"]):
+            yield key, json.loads(buffer[offsets[2 * position] - base:offsets[2 * position + 1] - base])
+
+
+def load_vehicle(filepath: str, index: int, keys=None):
+    """Returns the header and frames of one vehicle of a capture file.
+
+    With keys given (some of LEAD_KEYS), only those members of each frame are decoded.
+    """
+    data = {"i": get_capture(filepath)["headers"][index]}
+    if keys is None:
+        data.update(iter_frames(filepath, index))
+    else:
+        data.update((key, lead()) for key, lead, _ in iter_lazy_frames(filepath, index, keys))
+    return data
+
+
+def get_member_pattern(keys):
+    """Matches the start of the keys members of a JSON frame. Only LEAD_KEYS can be picked out this way."""
+    return re.compile(rb'"(' + b"|".join(key.encode() for key in keys) + rb')"\s*:\s*')
+
+
+LEAD_MEMBER = get_member_pattern(LEAD_KEYS)
+
+
+def decode_lead(chunk: bytes, pattern=LEAD_MEMBER):
+    """Decodes only the LEAD_KEYS members of a JSON frame, or those pattern matches."""
+    # Latin-1 keeps character offsets equal to the byte offsets matched.
+    text = chunk.decode("latin-1")
+    frame = {}
+    for match in pattern.finditer(chunk):
+        frame[match.group(1).decode()] = DECODER.raw_decode(text, match.end())[0]
+    return frame
+
+
+def iter_lazy_frames(filepath: str, index: int, keys=LEAD_KEYS):
+    """Yields (key, lead, frame) for every frame of one vehicle, in file order.
+
+    Nothing is decoded until lead() (just the keys members, LEAD_KEYS by
+    default) or frame() (the whole frame) is called, which has to happen
+    before moving on.
+    """
+    if is_binary(filepath):
+        vehicle = load_columns(filepath, index)
+        columns = list(vehicle["columns"].items())
+        leadcolumns = [(leaf, column) for leaf, column in columns
+                       if leaf.split(PATH_SEPARATOR)[0] in keys]
+        for position, key in enumerate(vehicle["frames"]):
+            yield (key, lambda position=position: get_binary_frame(vehicle, position, leadcolumns, keys),
+                   lambda position=position: get_binary_frame(vehicle, position, columns))
+        return
+    pattern = LEAD_MEMBER if keys == LEAD_KEYS else get_member_pattern(keys)
+    vehicle = get_capture(filepath)["vehicles"][index]
+    offsets = vehicle["offsets"]
+    buffer, base = open_vehicle(filepath, vehicle)
+    with buffer:
+        for position, key in enumerate(vehicle["frames"]):
+            start = offsets[2 * position] - base
+            end = offsets[2 * position + 1] - base
+            yield (key, lambda start=start, end=end: decode_lead(buffer[start:end], pattern),
+                   lambda start=start, end=end: json.loads(buffer[start:end]))
+
+
+def load_frame(filepath: str, index: int, key: str = "1", keys=LEAD_KEYS):
+    """Returns the frame key of one vehicle, decoded only as far as keys, or None if it has no such frame.
+
+    Nothing past the frame is read, not even out of a compressed capture.
+    """
+    if is_binary(filepath):
+        vehicle = load_columns(filepath, index)
+        if key not in vehicle["frames"]:
+            return None
+        columns = [(leaf, column) for leaf, column in vehicle["columns"].items()
+                   if leaf.split(PATH_SEPARATOR)[0] in keys]
+        return get_binary_frame(vehicle, vehicle["frames"].index(key), columns, keys)
+    vehicle = get_capture(filepath)["vehicles"][index]
+    if key not in vehicle["frames"]:
+        return None
+    position = vehicle["frames"].index(key)
+    start = vehicle["offsets"][2 * position]
+    end = vehicle["offsets"][2 * position + 1]
+    if is_compressed(filepath):
+        with decompress(filepath, end, start) as buffer:
+            chunk = bytes(buffer)
+    else:
+        with open_buffer(filepath) as buffer:
+            chunk = buffer[start:end]
+    return decode_lead(chunk, LEAD_MEMBER if keys == LEAD_KEYS else get_member_pattern(keys))
+
+
+def hash_frames(filepath: str, index: int, first: int, counts):
+    """Returns a SHA-1 hex digest of the first count frames numbered from first, for each count in counts.
+
+    Digests only change when those frames do, so frames appended to a capture
+    leave the digest of the ones before them untouched. .vmcc channel files
+    have no frames and are hashed whole, whatever the counts.
+    """
+    if is_channels(filepath):
+        filehash = hashlib.sha1()
+        with open_buffer(filepath) as buffer:
+            filehash.update(buffer)
+        return [filehash.hexdigest() for _ in counts]
+    if is_binary(filepath):
+        vehicle = load_columns(filepath, index)
+        positions = [position for position, key in enumerate(vehicle["frames"])
+                     if key.isdigit() and int(key) >= first]
+        digests = []
+        for count in counts:
+            framehash = hashlib.sha1()
+            selected = positions[:count]
+            if selected:
+                for leaf, column in sorted(vehicle["columns"].items()):
+                    framehash.update(leaf.encode())
+                    framehash.update(column[selected[0]:selected[-1] + 1].tobytes())
+                extras = {key: vehicle["extras"][key] for key in
+                          (vehicle["frames"][position] for position in selected) if key in vehicle["extras"]}
+                framehash.update(json.dumps(extras, sort_keys=True).encode())
+            digests.append(framehash.hexdigest())
+        return digests
+    vehicle = get_capture(filepath)["vehicles"][index]
+    offsets = vehicle["offsets"]
+    framehash = hashlib.sha1()
+    digests = []
+    pending = sorted(counts)
+    hashed = 0
+    buffer, base = open_vehicle(filepath, vehicle)
+    with buffer:
+        for position, key in enumerate(vehicle["frames"]):
+            while pending and hashed >= pending[0]:
+                digests.append(framehash.hexdigest())
+                pending.pop(0)
+            if not pending:
+                break
+            if key.isdigit() and int(key) >= first:
+                framehash.update(buffer[offsets[2 * position] - base:offsets[2 * position + 1] - base])
+                hashed += 1
+    digests.extend(framehash.hexdigest() for _ in pending)
+    # Back in the order asked for.
+    bycount = dict(zip(sorted(counts), digests))
+    return [bycount[count] for count in counts]
+
+
+def load_vehicle_range(filepath: str, index: int, start: float, end: float, bytime: bool = False, keys=None):
+    """Returns one vehicle like load_vehicle(), cut down to the frames from start to end, and how many frames lead up to them.
+
+    start and end are frame numbers, or with bytime set, seconds into the
+    capture at which a frame begins. Frames before start are only decoded
+    as far as LEAD_KEYS, since unwrapping rotations and spinning wheels
+    needs their history, and they come first. Frames after end aren't read
+    at all. Frames are renumbered from "1" and the header's "fC" counts them.
+    keys is as for load_vehicle(), and applies to every frame.
+    """
+    header = dict(get_capture(filepath)["headers"][index])
+    data = {}
+    lead = 0
+    elapsed = 0.0
+    for key, leadframe, wholeframe in iter_lazy_frames(filepath, index, LEAD_KEYS if keys is None else keys):
+        if keys is not None:
+            # Every frame is only decoded as far as keys.
+            wholeframe = leadframe
+        if not key.isdigit():
+            continue
+        frame = None
+        if bytime:
+            frame = leadframe()
+            position = elapsed / 1000.0
+            elapsed += frame.get("fT", 0.0)
+        else:
+            position = int(key)
+        if position > end:
+            break
+        if position < start:
+            if frame is None:
+                frame = leadframe()
+            lead += 1
+        elif frame is None or keys is None:
+            frame = wholeframe()
+        data[str(len(data) + 1)] = frame
+    header["fC"] = len(data)
+    data["i"] = header
+    return data, lead
+
+
+# Binary captures (.vmcb) store every numeric frame value as a float64 column,
+# so re-imports can map the file and skip JSON decoding entirely. Layout:
+# magic, version and directory length, the JSON directory, zero padding up to
+# an 8 byte boundary, then each vehicle's columns back to back.
+BINARY_EXTENSION = ".vmcb"
+BINARY_MAGIC = b"VMCB"
+BINARY_VERSION = 1
+BINARY_PREAMBLE = struct.Struct("<4sII")
+# Separates the keys of a flattened frame value, e.g. "P/21/rW".
+PATH_SEPARATOR = "/"
+# Channel files (.vmcc) hold already computed channels, see core.save_channels().
+CHANNELS_EXTENSION = ".vmcc"
+CHANNELS_MAGIC = b"VMCC"
+
+
+def is_binary(filepath: str):
+    return filepath.lower().endswith(BINARY_EXTENSION)
+
+
+def is_channels(filepath: str):
+    return filepath.lower().endswith(CHANNELS_EXTENSION)
+
+
+def flatten_frame(frame: dict, prefix=""):
+    """Yields (path, value) for every leaf of a frame."""
+    for key, value in frame.items():
+        if isinstance(value, dict):
+            yield from flatten_frame(value, prefix + key + PATH_SEPARATOR)
+        else:
+            yield prefix + key, value
+
+
+def unflatten_frame(values):
+    frame = {}
+    for leaf, value in values:
+        keys = leaf.split(PATH_SEPARATOR)
+        node = frame
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = value
+    return frame
+
+
+def convert_capture(filepath: str, outpath: str = None):
+    """Writes a capture file out as a .vmcb binary capture and returns its path."""
+    if outpath is None:
+        outpath = filepath + BINARY_EXTENSION
+    directory = {"byteorder": sys.byteorder, "vehicles": []}
+    blobs = []
+    offset = 0
+    for index, header in enumerate(get_capture(filepath)["headers"]):
+        keys = []
+        columns = {}
+        extras = {}
+        for key, frame in sorted(iter_frames(filepath, index), key=frame_order):
+            for leaf, value in flatten_frame(frame):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    column = columns.get(leaf)
+                    if column is None:
+                        # Frames that lack a value read back as NaN.
+                        column = array("d", [nan]) * len(keys)
+                        columns[leaf] = column
+                    column.append(value)
+                else:
+                    extras.setdefault(key, {})[leaf] = value
+            keys.append(key)
+            for column in columns.values():
+                if len(column) < len(keys):
+                    column.append(nan)
+        vehicle = {"header": header, "frames": keys, "extras": extras, "columns": {}}
+        for leaf, column in columns.items():
+            vehicle["columns"][leaf] = offset
+            blobs.append(column)
+            offset += len(column) * column.itemsize
+        directory["vehicles"].append(vehicle)
+    return write_binary(outpath, BINARY_MAGIC, directory, blobs)
+
+
+def write_binary(outpath: str, magic: bytes, directory: dict, blobs):
+    """Writes a JSON directory followed by float64 arrays, in the .vmcb layout."""
+    encoded = json.dumps(directory, separators=(",", ":")).encode("utf-8")
+    padding = -(BINARY_PREAMBLE.size + len(encoded)) % 8
+    with open(outpath, "wb") as binaryfile:
+        binaryfile.write(BINARY_PREAMBLE.pack(
+            magic, BINARY_VERSION, len(encoded)))
+        binaryfile.write(encoded)
+        binaryfile.write(b"\0" * padding)
+        for blob in blobs:
+            blob.tofile(binaryfile)
+    return outpath
+
+
+def frame_order(item):
+    key = item[0]
+    return (0, int(key), key) if key.isdigit() else (1, 0, key)
+
+
+def get_binary_capture(filepath: str):
+    """Returns a binary capture's directory and the memory map its columns live in."""
+    return read_binary(filepath, BINARY_MAGIC)
+
+
+def read_binary(filepath: str, magic: bytes):
+    """Returns the directory of a file written by write_binary() and the memory map its arrays live in."""
+    buffer = open_buffer(filepath)
+    filemagic, version, length = BINARY_PREAMBLE.unpack_from(buffer)
+    if filemagic != magic or version != BINARY_VERSION:
+        buffer.close()
+        raise ValueError("Not a version " + str(BINARY_VERSION) + " " + magic.decode().lower() + " file.")
+    directory = json.loads(buffer[BINARY_PREAMBLE.size:BINARY_PREAMBLE.size + length])
+    start = BINARY_PREAMBLE.size + length
+    directory["data_start"] = start + (-start % 8)
+    return directory, buffer
+
+
+def get_binary_array(directory: dict, buffer, offset: int, count: int):
+    """Returns a float64 array stored by write_binary(), as a view into buffer when possible."""
+    start = directory["data_start"] + offset
+    column = memoryview(buffer)[start:start + count * 8].cast("d")
+    if directory["byteorder"] != sys.byteorder:
+        column = array("d", column)
+        column.byteswap()
+    return column
+
+
+def load_columns(filepath: str, index: int):
+    """Returns one vehicle of a binary capture as {"header", "frames", "columns"}.
+
+    Columns map each flattened frame path to a float64 memoryview straight
+    into the mapped file, in the order given by "frames".
+    """
+    directory, buffer = get_binary_capture(filepath)
+    vehicle = directory["vehicles"][index]
+    count = len(vehicle["frames"])
+    columns = {}
+    for leaf, offset in vehicle["columns"].items():
+        columns[leaf] = get_binary_array(directory, buffer, offset, count)
+    return {"header": vehicle["header"], "frames": vehicle["frames"], "extras": vehicle["extras"], "columns": columns}
+
+
+def get_binary_frame(vehicle: dict, position: int, columns, keys=None):
+    """Rebuilds the frame at position of a load_columns() vehicle from the (leaf, column) pairs given.
+
+    With keys given, only the values that aren't numbers of those members are added back too.
+    """
+    values = [(leaf, column[position])
+              for leaf, column in columns if column[position] == column[position]]
+    extras = vehicle["extras"].get(vehicle["frames"][position], {}).items()
+    if keys is not None:
+        extras = [(leaf, value) for leaf, value in extras if leaf.split(PATH_SEPARATOR)[0] in keys]
+    values.extend(extras)
+    return unflatten_frame(values)
+
+
+def iter_binary_frames(filepath: str, index: int):
+    vehicle = load_columns(filepath, index)
+    columns = list(vehicle["columns"].items())
+    for position, key in enumerate(vehicle["frames"]):
+        yield key, get_binary_frame(vehicle, position, columns)
+
+
+class ColumnFrames:
+    """The frames "1" onwards of a binary capture vehicle, kept as its columns.
+
+    Stands in for the list of frame dicts core.get_frames() returns, without
+    building any: core reads whole columns with column(), which are views
+    straight into the mapped file. Indexing still rebuilds a single frame.
+    lead is the number of frames leading up to an import range, see
+    load_vehicle_range(), which core doesn't compute the driver for.
+    """
+
+    def __init__(self, vehicle: dict, count: int, lead: int = 0):
+        self.vehicle = vehicle
+        self.header = vehicle["header"]
+        keys = vehicle["frames"]
+        limit = min(count, len(keys))
+        # Up to the first missing frame, like core.get_frames().
+        self.count = 0
+        while self.count < limit and keys[self.count] == str(self.count + 1):
+            self.count += 1
+        self.lead = lead
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position: int):
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        return get_binary_frame(self.vehicle, position, self.vehicle["columns"].items())
+
+    def head(self, count: int, lead: int = 0):
+        """Returns the first count frames, the first lead of them leading up to an import range."""
+        return ColumnFrames(self.vehicle, count, lead)
+
+    def has(self, leaf: str):
+        return leaf in self.vehicle["columns"]
+
+    def column(self, leaf: str):
+        """Returns the values of a flattened frame path, NaN where a frame lacks it."""
+        return self.vehicle["columns"][leaf][:self.count]
+
+    def leaves(self, prefix: str):
+        """Returns the flattened frame paths starting with prefix, in the order they first occur."""
+        return [leaf for leaf in self.vehicle["columns"] if leaf.startswith(prefix)]
+
+
+def load_column_frames(filepath: str, index: int):
+    """Returns one vehicle of a binary capture as ColumnFrames."""
+    vehicle = load_columns(filepath, index)
+    return ColumnFrames(vehicle, vehicle["header"].get("fC", len(vehicle["frames"])))
+
+
+def get_sidecar(filepath: str, create: bool = False):
+    """Returns the .vmcb sidecar of a capture if it is up to date, writing it first if create is set."""
+    if is_binary(filepath) or is_channels(filepath):
+        return filepath
+    sidecar = filepath + BINARY_EXTENSION
+    if path.isfile(sidecar) and stat(sidecar).st_mtime_ns >= stat(filepath).st_mtime_ns:
+        return sidecar
+    if create:
+        return convert_capture(filepath, sidecar)
+    return None
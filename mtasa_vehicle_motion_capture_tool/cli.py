@@ -0,0 +1,142 @@
+"""Command line tools for preparing captures on machines without Blender.
+
+    python -m mtasa_vehicle_motion_capture_tool info capture.json
+    python -m mtasa_vehicle_motion_capture_tool convert captures/*.json
+    python -m mtasa_vehicle_motion_capture_tool precompute captures/*.json --workers 8
+    python -m mtasa_vehicle_motion_capture_tool batch jobs.json --blender /path/to/blender
+
+precompute writes a .vmcc channel file next to each capture (or into
+--output), which the addon imports without doing any of the math again.
+batch hands job files to a single background Blender process, see batch.py.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count, path
+import subprocess
+
+from .capture import CHANNELS_EXTENSION, convert_capture, get_capture, load_vehicle
+from .core import (
+    DECIMATE_ANGLE_TOLERANCE,
+    DECIMATE_POSITION_TOLERANCE,
+    DEFAULT_WHEELS,
+    compute_vehicle,
+    decimate_channels,
+    frame_times,
+    save_channels,
+)
+
+
+def precompute_capture(filepath: str, outpath: str, wheels: dict, withped: bool, tolerances=None):
+    vehicles = []
+    for vehindex in range(len(get_capture(filepath)["headers"])):
+        computed = compute_vehicle(load_vehicle(filepath, vehindex), wheels, withped)
+        if computed is None:
+            raise ValueError("Vehicle " + str(vehindex + 1) + " has no usable first frame.")
+        if tolerances is not None:
+            computed["channels"] = decimate_channels(
+                computed["channels"], frame_times(computed["frametimes"], 1.0, 0.0), *tolerances)[0]
+        vehicles.append(computed)
+    return save_channels(outpath, vehicles)
+
+
+def get_outpath(filepath: str, outdir, extension: str):
+    outpath = filepath + extension
+    if outdir:
+        outpath = path.join(outdir, path.basename(outpath))
+    return outpath
+
+
+def run_batch(blender: str, jobpaths):
+    """Runs batch.main() on the job files in one background Blender process, returning its exit code."""
+    package = path.dirname(path.dirname(path.abspath(__file__)))
+    expression = "import sys; sys.path.insert(0, " + repr(package) + "); " + \
+        "from mtasa_vehicle_motion_capture_tool import batch; batch.main()"
+    # Without --python-exit-code, Blender exits 0 even when the script raises.
+    command = [blender, "--background", "--python-exit-code", "1", "--python-expr", expression, "--"]
+    return subprocess.call(command + [path.abspath(jobpath) for jobpath in jobpaths])
+
+
+def print_info(filepath: str):
+    headers = get_capture(filepath)["headers"]
+    if not headers:
+        print(filepath + ": not a VehMocap capture.")
+        return
+    print(filepath + ":")
+    for vehindex, header in enumerate(headers):
+        line = "  " + str(vehindex + 1) + ". " + str(header.get("vN")) + " (" + str(header.get("vT")) + "), " + \
+            str(header.get("fC")) + " keyframes at " + str(header.get("kfPS")) + " kfPS, " + str(header.get("d")) + "s"
+        if "pM" in header:
+            line += ", driver " + header["pM"]
+        print(line)
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog="python -m mtasa_vehicle_motion_capture_tool",
+                            description="Prepare VehMocap captures without Blender.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="list the vehicles in captures")
+    info.add_argument("files", nargs="+")
+    convert = commands.add_parser(
+        "convert", help="write .vmcb binary captures")
+    convert.add_argument("files", nargs="+")
+    convert.add_argument("-o", "--output", help="directory to write to")
+    precompute = commands.add_parser(
+        "precompute", help="write .vmcc files holding every computed channel")
+    precompute.add_argument("files", nargs="+")
+    precompute.add_argument("-o", "--output", help="directory to write to")
+    precompute.add_argument("--front-radius", type=float, default=DEFAULT_WHEELS["lf"][0],
+                            help="front wheel radius (default: %(default)s)")
+    precompute.add_argument("--back-radius", type=float, default=DEFAULT_WHEELS["lb"][0],
+                            help="back wheel radius (default: %(default)s)")
+    precompute.add_argument("--no-ped", action="store_true",
+                            help="leave out the driver's bones")
+    precompute.add_argument("--decimate", action="store_true",
+                            help="drop keyframes within the tolerances below")
+    precompute.add_argument("--position-tolerance", type=float, default=DECIMATE_POSITION_TOLERANCE,
+                            help="decimation location tolerance (default: %(default)s)")
+    precompute.add_argument("--angle-tolerance", type=float, default=DECIMATE_ANGLE_TOLERANCE,
+                            help="decimation angle tolerance in degrees (default: %(default)s)")
+    batch = commands.add_parser(
+        "batch", help="run batch import job files in one background Blender")
+    batch.add_argument("files", nargs="+")
+    batch.add_argument("--blender", default="blender",
+                       help="Blender executable (default: %(default)s)")
+    for command in (convert, precompute):
+        command.add_argument("-j", "--workers", type=int, default=cpu_count() or 1,
+                             help="captures processed at once (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        for filepath in args.files:
+            print_info(filepath)
+        return 0
+    if args.command == "batch":
+        return run_batch(args.blender, args.files)
+    jobs = []
+    if args.command == "convert":
+        for filepath in args.files:
+            jobs.append((convert_capture, filepath,
+                        get_outpath(filepath, args.output, ".vmcb")))
+    else:
+        wheels = {
+            "lf": (args.front_radius, True),
+            "rf": (args.front_radius, False),
+            "lb": (args.back_radius, True),
+            "rb": (args.back_radius, False),
+        }
+        tolerances = None
+        if args.decimate:
+            tolerances = (args.position_tolerance, args.angle_tolerance)
+        for filepath in args.files:
+            jobs.append((precompute_capture, filepath, get_outpath(
+                filepath, args.output, CHANNELS_EXTENSION), wheels, not args.no_ped, tolerances))
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as pool:
+        futures = [(job[1], pool.submit(*job)) for job in jobs]
+        for filepath, future in futures:
+            try:
+                print(filepath + " -> " + future.result())
+            except (OSError, ValueError, KeyError) as error:
+                failed += 1
+                print(filepath + ": " + str(error))
+    return 1 if failed else 0
@@ -0,0 +1,1210 @@
+"""Whole-take channel math that doesn't need Blender.
+
+Every function here works on entire columns of a capture at once. NumPy is
+used when it can be imported (Blender always ships it), with plain Python
+loops giving the exact same results otherwise.
+
+compute_vehicle() turns one captured vehicle into a list of channels, each a
+(target, data_path, indices, columns) tuple. Targets are "veh" and the
+wheels ("lf", "rf", "lb", "rb") its type's channel plan has, the camera rig's
+"holder", "target", "camobj" and "camera", and "ped:<bone id>" for the driver
+(or "bone:<bone name>" once posed by pose_bone_channels()). Only writing those
+channels needs Blender, so vehicles can be computed in worker processes.
+
+Channels fall into the "body", "wheels", "camera" and "driver" groups, see
+get_channel_group(). Imports can be limited to some of them, in which case
+the others are neither decoded nor computed.
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bisect import bisect_left, bisect_right
+from math import acos, asin, atan2, ceil, cos, floor, pi, radians, sin, sqrt
+import multiprocessing
+import sys
+
+from .capture import (
+    CHANNELS_MAGIC,
+    LEAD_KEYS,
+    PATH_SEPARATOR,
+    ColumnFrames,
+    get_binary_array,
+    get_capture,
+    is_binary,
+    is_channels,
+    load_column_frames,
+    load_frame,
+    load_vehicle,
+    load_vehicle_range,
+    read_binary,
+    write_binary,
+)
+from .profiling import ImportProfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# An Euler angle that jumps by more than this between two samples is assumed
+# to have wrapped around and gets shifted by a full turn.
+UNWRAP_THRESHOLD_X = 180.0
+UNWRAP_THRESHOLD_YZ = 90.0
+# Speeds are recorded as the distance travelled in 1/50 of a second.
+SPEED_TIMEBASE = 0.02
+# Default keyframe reduction tolerances, in Blender units and degrees.
+DECIMATE_POSITION_TOLERANCE = 0.001
+DECIMATE_ANGLE_TOLERANCE = 0.05
+# Shorter spans are searched in plain Python, where NumPy's call overhead
+# costs more than the loop it saves.
+SIMPLIFY_NUMPY_SPAN = 64
+# Quaternions closer than this (by dot product) are blended linearly, since
+# slerp's sin(theta) divisor loses all precision there.
+SLERP_LINEAR_DOT = 0.9995
+
+
+# Components keyed for each vehicle type (the header's "vT"), as (capture key,
+# target, rule) entries. "body" unwraps all three rotations, "wheel" spins the
+# X rotation from the vehicle's speed instead. Bikes are assumed to carry their
+# front and rear wheels under the "lf" and "lb" keys. Types not listed only key
+# their body.
+AUTOMOBILE_PLAN = (
+    ("v", "veh", "body"),
+    ("lf", "lf", "wheel"),
+    ("rf", "rf", "wheel"),
+    ("lb", "lb", "wheel"),
+    ("rb", "rb", "wheel"),
+)
+BIKE_PLAN = (
+    ("v", "veh", "body"),
+    ("lf", "lf", "wheel"),
+    ("lb", "lb", "wheel"),
+)
+BODY_PLAN = (
+    ("v", "veh", "body"),
+)
+CHANNEL_PLANS = {
+    "Automobile": AUTOMOBILE_PLAN,
+    "Monster Truck": AUTOMOBILE_PLAN,
+    "Quad": AUTOMOBILE_PLAN,
+    "Trailer": AUTOMOBILE_PLAN,
+    "Bike": BIKE_PLAN,
+    "BMX": BIKE_PLAN,
+    "Boat": BODY_PLAN,
+    "Plane": BODY_PLAN,
+    "Helicopter": BODY_PLAN,
+    "Train": BODY_PLAN,
+}
+
+
+# Channel groups by channel target. Imports can be limited to some groups, and
+# re-imports rewrite a group on its own when only its inputs changed.
+CHANNEL_GROUPS = {
+    "veh": "body",
+    "lf": "wheels",
+    "rf": "wheels",
+    "lb": "wheels",
+    "rb": "wheels",
+    "holder": "camera",
+    "target": "camera",
+    "camobj": "camera",
+    "camera": "camera",
+}
+GROUP_NAMES = ("body", "wheels", "camera", "driver")
+# Frame members each channel group is computed from. The body, "fT" and the
+# speed are always read, since they decide whether a frame is usable.
+FRAME_KEYS = ("v", "fT", "V", "l", "s")
+GROUP_KEYS = {
+    "body": (),
+    "wheels": ("lf", "rf", "lb", "rb"),
+    "camera": ("c",),
+}
+
+
+def get_channel_group(target: str):
+    if target.startswith("ped:") or target.startswith("bone:"):
+        return "driver"
+    return CHANNEL_GROUPS[target]
+
+
+def get_frame_keys(groups):
+    """Returns the frame members computing groups needs, or None if that takes whole frames.
+
+    The driver is most of a frame and can't be picked out on its own, see
+    capture.decode_lead(), so it needs whole frames.
+    """
+    if "driver" in groups:
+        return None
+    keys = list(FRAME_KEYS)
+    for group in groups:
+        keys += GROUP_KEYS[group]
+    return tuple(key for key in LEAD_KEYS if key in keys)
+
+
+def get_channel_plan(vehtype: str, frame=None, groups=GROUP_NAMES):
+    """Returns the plan entries of a vehicle type, only those frame has a component
+    for if given and only those of groups."""
+    plan = [entry for entry in CHANNEL_PLANS.get(vehtype, BODY_PLAN) if get_channel_group(entry[1]) in groups]
+    if frame is None:
+        return plan
+    return [entry for entry in plan if isinstance(frame.get(entry[0]), dict)]
+
+
+def get_capture_plan(filepath: str, vehindex: int, groups=GROUP_NAMES):
+    """Returns the plan entries compute_capture_vehicle() keys for one vehicle of a capture.
+
+    Those are the ones its first frame has a component for, or for .vmcc
+    channel files, the ones it holds channels for. Only the first frame is read.
+    """
+    vehtype = get_capture(filepath)["headers"][vehindex].get("vT")
+    if is_channels(filepath):
+        targets = {channel[0] for channel in load_channels(filepath)[vehindex]["channels"]}
+        return [entry for entry in get_channel_plan(vehtype, groups=groups) if entry[1] in targets]
+    return get_channel_plan(vehtype, load_frame(filepath, vehindex) or {}, groups)
+
+
+# Frames are a list of frame dicts, or capture.ColumnFrames for binary
+# captures, whose columns are read straight from the mapped file.
+def get_column(frames, key: str, leaf: str):
+    if isinstance(frames, ColumnFrames):
+        return frames.column(key + PATH_SEPARATOR + leaf)
+    return [frame[key][leaf] for frame in frames]
+
+
+def get_column_values(frames, leaf: str):
+    if isinstance(frames, ColumnFrames):
+        return frames.column(leaf)
+    return [frame[leaf] for frame in frames]
+
+
+def unwrap(values, threshold: float):
+    """Batch version of MTAVEHMOCAP_OT_RunAction.offsetrotationx/y/z.
+
+    Each sample is compared to the previous one (the first to 0.0) with the
+    same expressions the per-frame functions use, and the running sum of the
+    ±360 corrections is added to the samples. The result is bit-for-bit
+    identical to calling the per-frame functions in order.
+    """
+    if numpy is not None:
+        values = numpy.asarray(values, dtype=numpy.float64)
+        if not len(values):
+            return values
+        previous = numpy.empty_like(values)
+        previous[0] = 0.0
+        previous[1:] = values[:-1]
+        steps = (values + threshold < previous).astype(numpy.float64)
+        steps -= (values - threshold > previous)
+        return values + numpy.cumsum(steps) * 360.0
+    unwrapped = []
+    offset = 0.0
+    lastval = 0.0
+    for val in values:
+        if (val + threshold) < lastval:
+            offset += 360.0
+        elif (val - threshold) > lastval:
+            offset -= 360.0
+        lastval = val
+        unwrapped.append(val + offset)
+    return unwrapped
+
+
+def to_radians(values):
+    if numpy is not None:
+        # Multiplies by the same pi / 180 constant math.radians() uses.
+        return numpy.radians(numpy.asarray(values, dtype=numpy.float64))
+    return [radians(value) for value in values]
+
+
+def travel_distances(speeds, frametimes):
+    """Batch version of MTAVEHMOCAP_OT_RunAction.getvehicletraveldistance.
+
+    speeds are the "V" (or "l") values and frametimes the "fT" values, in
+    milliseconds, of every frame.
+    """
+    if numpy is not None:
+        speeds = numpy.asarray(speeds, dtype=numpy.float64)
+        frametimes = numpy.asarray(frametimes, dtype=numpy.float64)
+        return frametimes * 0.001 * speeds / SPEED_TIMEBASE
+    return [frametime * 0.001 * speed / SPEED_TIMEBASE for speed, frametime in zip(speeds, frametimes)]
+
+
+def get_speeds(frames):
+    if isinstance(frames, ColumnFrames):
+        speeds = frames.column("V") if frames.has("V") else None
+        if speeds is not None and all(speed == speed for speed in speeds):
+            return speeds
+        fallback = frames.column("l")
+        if speeds is None:
+            return fallback
+        # NaN where a frame has no "V".
+        return [speed if speed == speed else other for speed, other in zip(speeds, fallback)]
+    return [frame["V"] if "V" in frame else frame["l"] for frame in frames]
+
+
+def spin_wheels(dists, wheels: dict):
+    """Whole-take version of MTAVEHMOCAP_OT_RunAction.offsetrotationwheel.
+
+    wheels maps a wheel name to (rX values, radius, isleftside). Returns the
+    spun X rotation of every wheel, in degrees, under the same names.
+
+    Each frame adds the whole turns covered by the travel distance, then the
+    change of the recorded angle in the direction of travel. Both increments
+    are accumulated in the same order as the per-frame function, so results
+    match it exactly.
+    """
+    if not wheels:
+        return {}
+    if numpy is not None:
+        return spin_wheels_numpy(dists, wheels)
+    spun = {}
+    for name, (values, radius, isleftside) in wheels.items():
+        circonference = 2 * pi * radius
+        offset = 0.0
+        lastval = 0.0
+        series = []
+        for val, dist in zip(values, dists):
+            rotations = dist / circonference
+            if abs(rotations) >= 1.0:
+                offset += (360.0 * floor(rotations))
+            if dist >= 0:
+                if val > lastval:
+                    offset += (val - lastval)
+                elif val < lastval:
+                    offset += 360.0 + (val - lastval)
+            elif dist < 0:
+                if val > lastval:
+                    offset -= (val - lastval)
+                elif val < lastval:
+                    offset -= (360.0 + (val - lastval))
+            lastval = val
+            series.append(offset if isleftside else -offset)
+        spun[name] = series
+    return spun
+
+
+def spin_wheels_numpy(dists, wheels: dict):
+    names = list(wheels)
+    dists = numpy.asarray(dists, dtype=numpy.float64)
+    values = numpy.array([numpy.asarray(wheels[name][0], dtype=numpy.float64)
+                         for name in names])
+    circonferences = numpy.array([[2 * pi * wheels[name][1]] for name in names])
+    rotations = dists / circonferences
+    whole = numpy.where(numpy.abs(rotations) >= 1.0,
+                        360.0 * numpy.floor(rotations), 0.0)
+    previous = numpy.zeros_like(values)
+    previous[:, 1:] = values[:, :-1]
+    change = values - previous
+    turn = numpy.where(values > previous, change, numpy.where(
+        values < previous, 360.0 + change, 0.0))
+    turn = numpy.where(dists >= 0, turn, numpy.where(dists < 0, -turn, 0.0))
+    # Interleaved so the running sum adds both increments one at a time.
+    steps = numpy.empty((len(names), values.shape[1] * 2))
+    steps[:, 0::2] = whole
+    steps[:, 1::2] = turn
+    offsets = numpy.cumsum(steps, axis=1)[:, 1::2]
+    return {name: offsets[row] if wheels[name][2] else -offsets[row]
+            for row, name in enumerate(names)}
+
+
+def is_frame_valid(frame: dict):
+    if not "v" in frame:
+        return False
+    if not "fT" in frame:
+        return False
+    if (not "V" in frame) and (not "l" in frame):
+        return False
+    if not "s" in frame:
+        return False
+    return True
+
+
+def get_frames(data):
+    """Returns the frames of a vehicle in order, up to the first one missing."""
+    if "frames" in data:
+        return data["frames"]
+    frames = []
+    for keyframe_counter in range(1, data["i"]["fC"] + 1):
+        frame = data.get(str(keyframe_counter))
+        if frame is None:
+            break
+        frames.append(frame)
+    return frames
+
+
+def frame_times(frametimes, fpsscale: float, start: float):
+    """Returns the scene frame each captured frame is keyed at.
+
+    Frame times are accumulated one at a time, exactly like the per-frame
+    import does, so both place keys at the same floats.
+    """
+    times = []
+    time = start
+    for frametime in frametimes:
+        times.append(time)
+        time += (frametime / fpsscale)
+    return times
+
+
+# keyframe_insert() replaces an existing key less than this many frames away
+# (BEZT_BINARYSEARCH_THRESH in Blender).
+KEY_MERGE_THRESHOLD = 0.01
+
+
+def merge_keys(co, frames, values, threshold: float = KEY_MERGE_THRESHOLD):
+    """Returns the flat (frame, value) list of an F-Curve's keys co with new keys merged in.
+
+    co is flat and sorted by frame, as keyframe_points.foreach_get("co")
+    gives it. Each new key replaces every existing one less than threshold
+    frames away, and of new keys that close to each other the last one
+    given wins, like keyframe_insert() one key at a time. Blender stores
+    frames as 32-bit floats, so keys are never matched on exact frames.
+    """
+    order = sorted(range(len(frames)), key=frames.__getitem__)
+    added = []
+    for index in order:
+        if added and frames[index] - added[-1][0] < threshold:
+            if index > added[-1][2]:
+                added[-1] = (frames[index], values[index], index)
+            continue
+        added.append((frames[index], values[index], index))
+    newframes = [key[0] for key in added]
+    keys = [key[:2] for key in added]
+    for frame, value in zip(co[0::2], co[1::2]):
+        position = bisect_left(newframes, frame)
+        if position < len(newframes) and newframes[position] - frame < threshold:
+            continue
+        if position and frame - newframes[position - 1] < threshold:
+            continue
+        keys.append((frame, value))
+    keys.sort(key=lambda key: key[0])
+    return [c for key in keys for c in key]
+
+
+def component_channels(frames, key: str, target: str, rX=None):
+    """Location and unwrapped rotation of one vehicle component.
+
+    Wheels pass in their X rotation from spin_wheels().
+    """
+    if rX is None:
+        rX = unwrap(get_column(frames, key, "rX"), UNWRAP_THRESHOLD_X)
+    rY = unwrap(get_column(frames, key, "rY"), UNWRAP_THRESHOLD_YZ)
+    rZ = unwrap(get_column(frames, key, "rZ"), UNWRAP_THRESHOLD_YZ)
+    return [
+        (target, "location", None, [
+            get_column(frames, key, "pX"),
+            get_column(frames, key, "pY"),
+            get_column(frames, key, "pZ"),
+        ]),
+        (target, "rotation_euler", None, [
+            to_radians(rX),
+            to_radians(rY),
+            to_radians(rZ),
+        ]),
+    ]
+
+
+def camera_channels(frames):
+    """The camera rig. "camera" gets the field of view in degrees, which Blender turns into a lens."""
+    return [
+        ("holder", "location", None, [
+            get_column(frames, "c", "cX"),
+            get_column(frames, "c", "cY"),
+            get_column(frames, "c", "cZ"),
+        ]),
+        ("target", "location", None, [
+            get_column(frames, "c", "tX"),
+            get_column(frames, "c", "tY"),
+            get_column(frames, "c", "tZ"),
+        ]),
+        ("camobj", "rotation_euler", None, [
+            [radians(0.0)] * len(frames),
+            [radians(0.0)] * len(frames),
+            to_radians(get_column(frames, "c", "r")),
+        ]),
+        ("camera", "fov", None, [get_column(frames, "c", "fov")]),
+    ]
+
+
+def ped_channels(frames):
+    """Driver bones. Bones are only keyed on frames that have ped data, and the
+    "P" entry only ever keys its location."""
+    if isinstance(frames, ColumnFrames):
+        return ped_column_channels(frames)
+    series = {}
+    for position, frame in enumerate(frames):
+        if "P" not in frame:
+            continue
+        for boneid, k in frame["P"].items():
+            target = "ped:" + boneid
+            keys = []
+            if boneid != "P":
+                if not "rW" in k:
+                    keys.append(("rotation_euler", (k["rX"], k["rY"], k["rZ"])))
+                else:
+                    keys.append(("rotation_quaternion", (k["rW"], k["rX"], k["rY"], k["rZ"])))
+            keys.append(("location", (k["pX"], k["pY"], k["pZ"])))
+            for data_path, values in keys:
+                entry = series.get((target, data_path))
+                if entry is None:
+                    entry = ([], [[] for _ in values])
+                    series[(target, data_path)] = entry
+                entry[0].append(position)
+                for column, value in zip(entry[1], values):
+                    column.append(value)
+    return [(target, data_path, entry[0], entry[1]) for (target, data_path), entry in series.items()]
+
+
+def ped_column_channels(frames):
+    """ped_channels() for binary captures. A bone's channels are keyed on the
+    frames its columns have values on, from frames.lead onwards."""
+    boneids = []
+    for leaf in frames.leaves("P" + PATH_SEPARATOR):
+        boneid = leaf.split(PATH_SEPARATOR)[1]
+        if boneid not in boneids:
+            boneids.append(boneid)
+    channels = []
+    for boneid in boneids:
+        prefix = "P" + PATH_SEPARATOR + boneid + PATH_SEPARATOR
+
+        def get(leaf):
+            return frames.column(prefix + leaf) if frames.has(prefix + leaf) else None
+        location = [get(leaf) for leaf in ("pX", "pY", "pZ")]
+        present = get_present(location[0], frames.lead)
+        keys = []
+        if boneid != "P":
+            euler = [get(leaf) for leaf in ("rX", "rY", "rZ")]
+            quaternion = get("rW")
+            if quaternion is None:
+                keys.append(("rotation_euler", euler, present))
+            else:
+                # Frames without "rW" hold an Euler rotation.
+                quaternionic = set(get_present(quaternion, frames.lead))
+                keys.append(("rotation_euler", euler, [index for index in present if index not in quaternionic]))
+                keys.append(("rotation_quaternion", [quaternion] + euler,
+                             [index for index in present if index in quaternionic]))
+        keys.append(("location", location, present))
+        for data_path, columns, indices in keys:
+            if indices:
+                channels.append(("ped:" + boneid, data_path, indices, [select(column, indices) for column in columns]))
+    return channels
+
+
+def get_present(column, start: int = 0):
+    """Returns the positions from start on where column isn't NaN."""
+    if numpy is not None:
+        values = numpy.asarray(column, dtype=numpy.float64)[start:]
+        return (numpy.flatnonzero(values == values) + start).tolist()
+    return [position for position in range(start, len(column)) if column[position] == column[position]]
+
+
+def select(column, indices):
+    if numpy is not None:
+        return numpy.asarray(column, dtype=numpy.float64)[indices].tolist()
+    return [column[index] for index in indices]
+
+
+# Transforms below are (quaternion, translation) pairs of component tuples.
+# Components are floats, or NumPy arrays holding one value per frame, so the
+# same math runs on single frames and on whole takes.
+
+
+def quaternion_multiply(a, b):
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return (aw * bw - ax * bx - ay * by - az * bz,
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw)
+
+
+def quaternion_rotate(q, v):
+    w, x, y, z = q
+    vx, vy, vz = v
+    tx = 2.0 * (y * vz - z * vy)
+    ty = 2.0 * (z * vx - x * vz)
+    tz = 2.0 * (x * vy - y * vx)
+    return (vx + w * tx + (y * tz - z * ty),
+            vy + w * ty + (z * tx - x * tz),
+            vz + w * tz + (x * ty - y * tx))
+
+
+def compose(a, b):
+    """The transform applying b, then a."""
+    rotated = quaternion_rotate(a[0], b[1])
+    return quaternion_multiply(a[0], b[0]), tuple(t + r for t, r in zip(a[1], rotated))
+
+
+def invert(transform):
+    w, x, y, z = transform[0]
+    conjugate = (w, -x, -y, -z)
+    return conjugate, tuple(-value for value in quaternion_rotate(conjugate, transform[1]))
+
+
+def euler_to_quaternion(x, y, z, vectorized: bool = False):
+    """XYZ Euler angles, in radians, as a quaternion."""
+    cosine, sine = (numpy.cos, numpy.sin) if vectorized else (cos, sin)
+    cx, sx = cosine(x * 0.5), sine(x * 0.5)
+    cy, sy = cosine(y * 0.5), sine(y * 0.5)
+    cz, sz = cosine(z * 0.5), sine(z * 0.5)
+    return quaternion_multiply(quaternion_multiply((cz, 0.0, 0.0, sz), (cy, 0.0, sy, 0.0)), (cx, sx, 0.0, 0.0))
+
+
+def quaternion_to_euler(q, order: str, vectorized: bool = False):
+    """A quaternion as Euler angles in one of Blender's rotation modes, e.g. "XYZ"."""
+    arctan, arcsin = (numpy.arctan2, numpy.arcsin) if vectorized else (atan2, asin)
+    w, x, y, z = q
+    matrix = (
+        (1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)),
+        (2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)),
+        (2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)),
+    )
+    # The first axis of the order is applied first: R = Rk Rj Ri.
+    i, j, k = ("XYZ".index(axis) for axis in order)
+    parity = 1.0 if order in ("XYZ", "YZX", "ZXY") else -1.0
+    sine = -parity * matrix[k][i]
+    sine = numpy.clip(sine, -1.0, 1.0) if vectorized else min(max(sine, -1.0), 1.0)
+    angles = [0.0, 0.0, 0.0]
+    angles[i] = arctan(parity * matrix[k][j], matrix[k][k])
+    angles[j] = arcsin(sine)
+    angles[k] = arctan(parity * matrix[j][i], matrix[i][i])
+    return tuple(angles)
+
+
+def hold_columns(indices, columns, positions):
+    """Lines up a channel's columns with positions, holding the last value
+    over positions it wasn't keyed on."""
+    lookup = dict(zip(indices, range(len(indices))))
+    held = [[] for _ in columns]
+    current = 0
+    for position in positions:
+        current = lookup.get(position, current)
+        for target, column in zip(held, columns):
+            target.append(column[current])
+    return held
+
+
+def solve_pose(targets, rig, offset):
+    """Returns the pose (matrix_basis) of every captured bone of rig.
+
+    targets maps bone ids to their captured transform in ped space, which
+    offset takes to armature space. Bones are visited parents first, and
+    bones without a target follow their parent at rest.
+    """
+    poses = {}
+    armature = []
+    for bone in rig["bones"]:
+        rest = bone["rest"]
+        parent = None if bone["parent"] is None else rig["bones"][bone["parent"]]
+        target = targets.get(bone["id"])
+        if target is not None:
+            matrix = compose(offset, target)
+        elif parent is None:
+            matrix = rest
+        else:
+            matrix = compose(armature[bone["parent"]], compose(invert(parent["rest"]), rest))
+        armature.append(matrix)
+        if target is None:
+            continue
+        if parent is None:
+            poses[bone["id"]] = compose(invert(rest), matrix)
+        else:
+            poses[bone["id"]] = compose(compose(invert(rest), parent["rest"]),
+                                        compose(invert(armature[bone["parent"]]), matrix))
+    return poses
+
+
+def pose_bone_channels(channels, rig):
+    """Replaces the driver's bone channels with pose bone channels of its armature.
+
+    rig describes the armature: "bones", parents first, each with its
+    capture "id" (None for bones that aren't captured), "name", "parent"
+    index, "rest" transform (Bone.matrix_local, rigid) and "mode" (the pose
+    bone's rotation mode), and "space", the armature's transform in ped
+    space (the space of the "ped:P" empty, which stays unrotated). Bones are
+    posed so they land where Copy Transforms constraints on the captured
+    empties would put them. New channels target "bone:<name>" with full
+    pose.bones[...] data paths. "ped:P" is kept as it is.
+    """
+    captured = {}
+    kept = []
+    for channel in channels:
+        target, data_path, indices, columns = channel
+        if target.startswith("ped:") and target != "ped:P":
+            captured.setdefault(target[4:], {})[data_path] = (indices, columns)
+        else:
+            kept.append(channel)
+    if not captured:
+        return channels
+    positions = sorted(set().union(*(indices for bone in captured.values() for indices, _ in bone.values())))
+    offset = invert(rig["space"])
+    targets = {}
+    for boneid, paths in captured.items():
+        location = hold_columns(*paths["location"], positions)
+        if "rotation_quaternion" in paths:
+            rotation = hold_columns(*paths["rotation_quaternion"], positions)
+        else:
+            rotation = hold_columns(*paths["rotation_euler"], positions)
+        targets[boneid] = (rotation, location)
+    if numpy is not None:
+        for boneid, (rotation, location) in targets.items():
+            rotation = tuple(numpy.asarray(column, dtype=numpy.float64) for column in rotation)
+            if len(rotation) == 3:
+                rotation = euler_to_quaternion(*rotation, vectorized=True)
+            targets[boneid] = (rotation, tuple(numpy.asarray(column, dtype=numpy.float64) for column in location))
+        poses = solve_pose(targets, rig, offset)
+    else:
+        poses = {}
+        for position in range(len(positions)):
+            frame = {}
+            for boneid, (rotation, location) in targets.items():
+                values = tuple(column[position] for column in rotation)
+                if len(values) == 3:
+                    values = euler_to_quaternion(*values)
+                frame[boneid] = (values, tuple(column[position] for column in location))
+            for boneid, pose in solve_pose(frame, rig, offset).items():
+                series = poses.setdefault(boneid, ([[], [], [], []], [[], [], []]))
+                for column, value in zip(series[0] + series[1], pose[0] + pose[1]):
+                    column.append(value)
+    for bone in rig["bones"]:
+        if bone["id"] not in poses:
+            continue
+        rotation, location = poses[bone["id"]]
+        path = 'pose.bones["' + bone["name"] + '"].'
+        if bone["mode"] == "QUATERNION":
+            rotation = continuous_quaternions(rotation)
+            kept.append(("bone:" + bone["name"], path + "rotation_quaternion", positions, list(rotation)))
+        else:
+            if numpy is not None:
+                rotation = quaternion_to_euler(rotation, bone["mode"], vectorized=True)
+            else:
+                angles = [quaternion_to_euler(q, bone["mode"]) for q in zip(*rotation)]
+                rotation = tuple(list(column) for column in zip(*angles)) if angles else ([], [], [])
+            kept.append(("bone:" + bone["name"], path + "rotation_euler", positions,
+                         [unwrap_radians(column) for column in rotation]))
+        kept.append(("bone:" + bone["name"], path + "location", positions, list(location)))
+    return kept
+
+
+def continuous_quaternions(rotation):
+    """Flips quaternions that would take the long way round from the one before."""
+    if numpy is not None:
+        rotation = numpy.array(rotation)
+        if rotation.shape[1] > 1:
+            dots = (rotation[:, 1:] * rotation[:, :-1]).sum(axis=0)
+            signs = numpy.cumprod(numpy.where(dots < 0.0, -1.0, 1.0))
+            rotation[:, 1:] *= signs
+        return tuple(rotation)
+    flipped = [[], [], [], []]
+    previous = None
+    for q in zip(*rotation):
+        if previous is not None and sum(a * b for a, b in zip(q, previous)) < 0.0:
+            q = tuple(-value for value in q)
+        for column, value in zip(flipped, q):
+            column.append(value)
+        previous = q
+    return tuple(flipped)
+
+
+def simplify(times, columns, tolerance: float):
+    """Returns the positions of the samples a channel can't do without.
+
+    Ramer-Douglas-Peucker over every column at once: a sample is dropped when,
+    on each column, interpolating linearly between the kept samples around it
+    misses it by no more than tolerance. The first and last samples are always
+    kept, and the columns of a channel keep the same samples.
+    """
+    count = len(times)
+    if count <= 2:
+        return list(range(count))
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    arrays = None
+    if numpy is not None and count > SIMPLIFY_NUMPY_SPAN:
+        arrays = (numpy.asarray(times, dtype=numpy.float64),
+                  numpy.array([numpy.asarray(column, dtype=numpy.float64) for column in columns]))
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        if arrays is not None and last - first > SIMPLIFY_NUMPY_SPAN:
+            worst, error = farthest_sample_numpy(*arrays, first, last)
+        else:
+            worst, error = farthest_sample(times, columns, first, last)
+        if error > tolerance:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [position for position, kept in enumerate(keep) if kept]
+
+
+def farthest_sample(times, columns, first: int, last: int):
+    """Returns the sample between first and last that strays furthest from
+    the line joining them, and by how much."""
+    span = times[last] - times[first]
+    worst = first + 1
+    error = -1.0
+    for position in range(first + 1, last):
+        factor = (times[position] - times[first]) / span if span > 0 else 0.0
+        for column in columns:
+            deviation = abs(column[position] - (column[first] + (column[last] - column[first]) * factor))
+            if deviation > error:
+                worst = position
+                error = deviation
+    return worst, error
+
+
+def farthest_sample_numpy(times, columns, first: int, last: int):
+    span = times[last] - times[first]
+    factors = times[first + 1:last] - times[first]
+    if span > 0:
+        factors = factors / span
+    else:
+        factors = numpy.zeros_like(factors)
+    starts = columns[:, first:first + 1]
+    lines = starts + (columns[:, last:last + 1] - starts) * factors
+    errors = numpy.abs(columns[:, first + 1:last] - lines).max(axis=0)
+    worst = int(numpy.argmax(errors))
+    return first + 1 + worst, float(errors[worst])
+
+
+def get_tolerance(data_path: str, position: float, angle: float):
+    """Tolerance of a channel's values, from a distance and an angle in degrees."""
+    if data_path.endswith("location"):
+        return position
+    if data_path.endswith("rotation_euler"):
+        return radians(angle)
+    if data_path.endswith("rotation_quaternion"):
+        # How far a quaternion component moves when rotated by angle.
+        return sin(radians(angle) / 2.0)
+    # Field of view, in degrees.
+    return angle
+
+
+def decimate_channels(channels, times, position: float, angle: float):
+    """Drops the keys simplify() deems redundant from computed channels.
+
+    times holds the time of every frame the channels index into. Channels
+    keyed on every frame gain indices. Returns the new channels and the
+    keyframe counts (values, not frames) before and after.
+    """
+    decimated = []
+    before = 0
+    after = 0
+    for target, data_path, indices, columns in channels:
+        channeltimes = times if indices is None else [times[index] for index in indices]
+        kept = simplify(channeltimes, columns, get_tolerance(data_path, position, angle))
+        before += len(channeltimes) * len(columns)
+        after += len(kept) * len(columns)
+        keptindices = kept if indices is None else [indices[index] for index in kept]
+        decimated.append((target, data_path, keptindices,
+                          [[column[index] for index in kept] for column in columns]))
+    return decimated, before, after
+
+
+def unwrap_radians(values):
+    """Shifts angles in radians by whole turns wherever they jump by more than half a turn."""
+    unwrapped = []
+    offset = 0.0
+    lastval = None
+    for val in values:
+        if lastval is not None:
+            if val - lastval > pi:
+                offset -= 2 * pi
+            elif lastval - val > pi:
+                offset += 2 * pi
+        lastval = val
+        unwrapped.append(val + offset)
+    return unwrapped
+
+
+def resample_grid(times, subframes: int):
+    """Returns evenly spaced times from the first to the last of times,
+    subframes per scene frame."""
+    if not len(times):
+        return []
+    count = int(floor((times[-1] - times[0]) * subframes)) + 1
+    return [times[0] + step / subframes for step in range(count)]
+
+
+def resample_positions(times, grid):
+    """Returns, for every grid time, the sample at or before it and how far
+    along the way to the next sample it lies."""
+    last = max(len(times) - 2, 0)
+    if numpy is not None:
+        times = numpy.asarray(times, dtype=numpy.float64)
+        grid = numpy.asarray(grid, dtype=numpy.float64)
+        positions = numpy.clip(numpy.searchsorted(times, grid, side="right") - 1, 0, last)
+        factors = numpy.zeros_like(grid)
+        if len(times) > 1:
+            spans = times[positions + 1] - times[positions]
+            moving = spans > 0
+            factors[moving] = (grid[moving] - times[positions[moving]]) / spans[moving]
+        return positions, factors
+    positions = []
+    factors = []
+    for time in grid:
+        position = min(max(bisect_right(times, time) - 1, 0), last)
+        span = times[position + 1] - times[position] if len(times) > 1 else 0.0
+        positions.append(position)
+        factors.append((time - times[position]) / span if span > 0 else 0.0)
+    return positions, factors
+
+
+def lerp_column(column, positions, factors):
+    following = min(1, len(column) - 1)
+    if numpy is not None:
+        column = numpy.asarray(column, dtype=numpy.float64)
+        positions = numpy.asarray(positions)
+        start = column[positions]
+        return start + (column[positions + following] - start) * factors
+    return [column[position] + (column[position + following] - column[position]) * factor
+            for position, factor in zip(positions, factors)]
+
+
+def slerp_columns(columns, positions, factors):
+    """Spherical interpolation of (w, x, y, z) columns, along the shorter arc."""
+    following = min(1, len(columns[0]) - 1)
+    if numpy is not None:
+        return slerp_columns_numpy(columns, positions, factors, following)
+    resampled = [[], [], [], []]
+    for position, factor in zip(positions, factors):
+        start = [column[position] for column in columns]
+        end = [column[position + following] for column in columns]
+        dot = sum(a * b for a, b in zip(start, end))
+        if dot < 0.0:
+            end = [-value for value in end]
+            dot = -dot
+        if dot > SLERP_LINEAR_DOT:
+            values = [a + (b - a) * factor for a, b in zip(start, end)]
+            length = sqrt(sum(value * value for value in values))
+            values = [value / length for value in values]
+        else:
+            theta = acos(dot)
+            weight_start = sin((1.0 - factor) * theta) / sin(theta)
+            weight_end = sin(factor * theta) / sin(theta)
+            values = [a * weight_start + b * weight_end for a, b in zip(start, end)]
+        for column, value in zip(resampled, values):
+            column.append(value)
+    return resampled
+
+
+def slerp_columns_numpy(columns, positions, factors, following: int):
+    columns = numpy.array([numpy.asarray(column, dtype=numpy.float64) for column in columns])
+    positions = numpy.asarray(positions)
+    factors = numpy.asarray(factors, dtype=numpy.float64)
+    start = columns[:, positions]
+    end = columns[:, positions + following]
+    dot = (start * end).sum(axis=0)
+    end = numpy.where(dot < 0.0, -end, end)
+    dot = numpy.abs(dot)
+    close = dot > SLERP_LINEAR_DOT
+    theta = numpy.arccos(numpy.where(close, 0.0, dot))
+    sine = numpy.where(close, 1.0, numpy.sin(theta))
+    weight_start = numpy.sin((1.0 - factors) * theta) / sine
+    weight_end = numpy.sin(factors * theta) / sine
+    values = start * weight_start + end * weight_end
+    blended = start + (end - start) * factors
+    blended /= numpy.sqrt((blended * blended).sum(axis=0))
+    return list(numpy.where(close, blended, values))
+
+
+def resample_channels(channels, times, subframes: int = 1):
+    """Interpolates computed channels onto an even grid of scene frames.
+
+    times holds the scene frame of every captured frame, relative to the
+    import's first frame. Locations, the field of view and Euler rotations
+    are interpolated linearly, quaternions with slerp. Vehicle rotations are
+    already unwrapped, the driver's Euler bones are unwrapped here so they
+    don't swing the long way round between two keys. Returns the grid and the resampled channels, which index into it.
+    A channel only covers the grid between its own first and last keys.
+    """
+    grid = resample_grid(times, subframes)
+    resampled = []
+    for target, data_path, indices, columns in channels:
+        channeltimes = times if indices is None else [times[index] for index in indices]
+        if not len(channeltimes):
+            continue
+        gridindices = list(range(bisect_left(grid, channeltimes[0]),
+                                 bisect_right(grid, channeltimes[-1])))
+        if not gridindices:
+            continue
+        positions, factors = resample_positions(channeltimes, [grid[index] for index in gridindices])
+        if data_path.endswith("rotation_quaternion"):
+            columns = slerp_columns(columns, positions, factors)
+        elif data_path == "rotation_euler" and target.startswith("ped:"):
+            columns = [lerp_column(unwrap_radians(column), positions, factors) for column in columns]
+        else:
+            columns = [lerp_column(column, positions, factors) for column in columns]
+        resampled.append((target, data_path, None if indices is None else gridindices, columns))
+    return grid, resampled
+
+
+def compute_vehicle(data, wheels: dict, withped: bool = True, profile=None, groups=GROUP_NAMES):
+    """Returns every channel of one captured vehicle, or None if its first frame is unusable.
+
+    The components keyed follow the channel plan of the vehicle's type, see
+    CHANNEL_PLANS. Only channels of groups are computed. wheels maps their wheel targets ("lf", "rf", "lb" and
+    "rb") to (radius, isleftside), with isleftside set to None for
+    components that aren't animated as wheels.
+
+    The result holds the vehicle's "header", the "frametimes" of its frames
+    and its "channels", as (target, data_path, indices, columns) tuples.
+    indices are the positions of the frames a channel is keyed on, or None
+    when it is keyed on all of them. Use frame_times() to place them in a
+    scene.
+
+    profile is an optional profiling.ImportProfile timing each channel group.
+    """
+    if profile is None:
+        profile = ImportProfile(False)
+    with profile.phase("compute/frames"):
+        frames = get_frames(data)
+        if not frames or not is_frame_valid(frames[0]):
+            return None
+        frametimes = get_column_values(frames, "fT")
+        plan = get_channel_plan(data["i"].get("vT"), frames[0], groups)
+    channels = []
+    with profile.phase("compute/body"):
+        for key, target, rule in plan:
+            if rule == "body":
+                channels += component_channels(frames, key, target)
+    with profile.phase("compute/wheels"):
+        spinning = {}
+        for key, target, rule in plan:
+            if rule == "wheel" and target in wheels and wheels[target][1] is not None:
+                spinning[target] = (get_column(frames, key, "rX"),) + tuple(wheels[target])
+        spun = {}
+        if spinning:
+            spun = spin_wheels(travel_distances(get_speeds(frames), frametimes), spinning)
+        for key, target, rule in plan:
+            if rule == "wheel":
+                channels += component_channels(frames, key, target, spun.get(target))
+    if "camera" in groups:
+        with profile.phase("compute/camera"):
+            channels += camera_channels(frames)
+    if withped and "driver" in groups:
+        with profile.phase("compute/ped"):
+            channels += ped_channels(frames)
+    return {"header": data["i"], "frametimes": frametimes, "channels": channels}
+
+
+def get_range_positions(frametimes, start: float, end: float, bytime: bool = False):
+    """Returns the first and one past the last position of the frames from
+    start to end, as load_vehicle_range() selects them."""
+    if not bytime:
+        last = max(min(floor(end), len(frametimes)), 0)
+        return min(max(ceil(start) - 1, 0), last), last
+    first = len(frametimes)
+    last = len(frametimes)
+    elapsed = 0.0
+    for position, frametime in enumerate(frametimes):
+        if elapsed / 1000.0 > end:
+            last = position
+            break
+        if elapsed / 1000.0 >= start and first == len(frametimes):
+            first = position
+        elapsed += frametime
+    return min(first, last), last
+
+
+def slice_vehicle(computed, first: int, last: int):
+    """Keeps the frames of a computed vehicle from position first up to last."""
+    channels = []
+    for target, data_path, indices, columns in computed["channels"]:
+        if indices is None:
+            channels.append((target, data_path, None, [column[first:last] for column in columns]))
+            continue
+        kept = [position for position, index in enumerate(indices) if first <= index < last]
+        if kept:
+            channels.append((target, data_path, [indices[position] - first for position in kept],
+                             [[column[position] for position in kept] for column in columns]))
+    sliced = dict(computed)
+    sliced["frametimes"] = computed["frametimes"][first:last]
+    sliced["channels"] = channels
+    return sliced
+
+
+def compute_capture_vehicle(filepath: str, vehindex: int, wheels: dict, withped: bool = True,
+                            profiled: bool = False, tolerances=None, resample=None, framerange=None,
+                            rig=None, groups=GROUP_NAMES):
+    """compute_vehicle() straight from a capture file, for use in worker processes.
+
+    When profiled, the timings are returned under the result's "profile" key
+    so they survive the trip back from a worker. resample is an optional
+    (fpsscale, subframes) pair: the channels are then resampled with
+    resample_channels() and their scene frames, relative to the first one,
+    returned under "times". tolerances is an optional (position, angle) pair
+    passed to decimate_channels(), whose keyframe counts are returned under
+    "keyframes".
+
+    framerange is an optional (start, end, bytime) selection, see
+    load_vehicle_range(). Frames leading up to it are computed (without the
+    driver) to carry the unwrapped rotations and wheel spin into the range,
+    then dropped.
+
+    rig optionally describes the driver's armature, to key its pose bones
+    directly instead of the bone empties, see pose_bone_channels().
+
+    groups are the channel groups to compute. Frames are only decoded as far
+    as they need, see get_frame_keys().
+    """
+    profile = ImportProfile(profiled)
+    if not withped:
+        groups = [group for group in groups if group != "driver"]
+    if is_channels(filepath):
+        with profile.phase("decode"):
+            computed = load_channels(filepath)[vehindex]
+            computed["channels"] = [channel for channel in computed["channels"]
+                                    if get_channel_group(channel[0]) in groups]
+            if framerange is not None:
+                computed = slice_vehicle(computed, *get_range_positions(computed["frametimes"], *framerange))
+    else:
+        lead = 0
+        keys = get_frame_keys(groups)
+        with profile.phase("decode"):
+            if is_binary(filepath):
+                # Columns are read as they are, no frame is decoded.
+                frames = load_column_frames(filepath, vehindex)
+                header = frames.header
+                if framerange is not None:
+                    lead, last = get_range_positions(frames.column("fT"), *framerange)
+                    frames = frames.head(last, lead)
+                    header = dict(header, fC=last)
+                data = {"i": header, "frames": frames}
+            elif framerange is not None:
+                data, lead = load_vehicle_range(filepath, vehindex, *framerange, keys=keys)
+            else:
+                data = load_vehicle(filepath, vehindex, keys)
+        computed = compute_vehicle(data, wheels, withped, profile, groups)
+        if computed is not None and lead:
+            computed = slice_vehicle(computed, lead, len(computed["frametimes"]))
+    if computed is not None and not len(computed["frametimes"]):
+        return None
+    if computed is not None and rig is not None:
+        with profile.phase("compute/pose"):
+            computed["channels"] = pose_bone_channels(computed["channels"], rig)
+    if computed is not None and resample is not None:
+        fpsscale, subframes = resample
+        with profile.phase("compute/resample"):
+            computed["times"], computed["channels"] = resample_channels(
+                computed["channels"], frame_times(computed["frametimes"], fpsscale, 0.0), subframes)
+    if computed is not None and tolerances is not None:
+        times = computed.get("times")
+        if times is None:
+            times = frame_times(computed["frametimes"], 1.0, 0.0)
+        with profile.phase("compute/decimate"):
+            channels, before, after = decimate_channels(
+                computed["channels"], times, *tolerances)
+        computed["channels"] = channels
+        computed["keyframes"] = (before, after)
+    if computed is not None and profiled:
+        computed["profile"] = profile.phases
+    return computed
+
+
+def compute_vehicles(filepath: str, tasks, workers: int = 1):
+    """Yields (task index, vehicle) for a list of compute_capture_vehicle() argument
+    tuples (without the file path), as they finish.
+
+    With more than one worker the vehicles are spread over a process pool.
+    Processes are spawned rather than forked, since forking would copy the
+    whole Blender process.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for index, task in enumerate(tasks):
+            yield index, compute_capture_vehicle(filepath, *task)
+        return
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+        futures = {pool.submit(compute_detached, filepath, *task): index
+                   for index, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def compute_detached(filepath: str, *task):
+    """compute_capture_vehicle() for worker processes, with its result copied
+    out of the mapped file so it can be pickled back."""
+    computed = compute_capture_vehicle(filepath, *task)
+    if computed is None:
+        return None
+    computed["frametimes"] = detach(computed["frametimes"])
+    computed["channels"] = [(target, data_path, indices, [detach(column) for column in columns])
+                            for target, data_path, indices, columns in computed["channels"]]
+    return computed
+
+
+def detach(values):
+    """Copies memoryviews (columns of mapped binary files, which can't be pickled) to arrays."""
+    if isinstance(values, memoryview):
+        return array("d", values)
+    return values
+
+
+# Wheel radii and sides assumed for standard GTA:SA models.
+DEFAULT_WHEELS = {
+    "lf": (0.34, True),
+    "rf": (0.34, False),
+    "lb": (0.34, True),
+    "rb": (0.34, False),
+}
+
+
+def save_channels(outpath: str, vehicles):
+    """Writes computed vehicles to a .vmcc channel file and returns its path.
+
+    Channel files hold the output of compute_vehicle() for every vehicle of a
+    capture, in the same layout as .vmcb binary captures.
+    """
+    directory = {"byteorder": sys.byteorder, "vehicles": []}
+    blobs = []
+    end = [0]
+
+    def store(values):
+        blob = array("d", values)
+        blobs.append(blob)
+        end[0] += len(blob) * blob.itemsize
+        return end[0] - len(blob) * blob.itemsize
+    for vehicle in vehicles:
+        entry = {
+            "header": vehicle["header"],
+            "count": len(vehicle["frametimes"]),
+            "frametimes": store(vehicle["frametimes"]),
+            "channels": [],
+        }
+        for target, data_path, indices, columns in vehicle["channels"]:
+            entry["channels"].append({
+                "target": target,
+                "data_path": data_path,
+                "count": entry["count"] if indices is None else len(indices),
+                "indices": None if indices is None else store(indices),
+                "columns": [store(column) for column in columns],
+            })
+        directory["vehicles"].append(entry)
+    return write_binary(outpath, CHANNELS_MAGIC, directory, blobs)
+
+
+def load_channels(filepath: str):
+    """Returns the vehicles of a .vmcc channel file, as compute_vehicle() would.
+
+    Frame times and columns are views straight into the mapped file.
+    """
+    directory, buffer = read_binary(filepath, CHANNELS_MAGIC)
+    vehicles = []
+    for entry in directory["vehicles"]:
+        channels = []
+        for channel in entry["channels"]:
+            indices = None
+            if channel["indices"] is not None:
+                indices = [int(index) for index in get_binary_array(
+                    directory, buffer, channel["indices"], channel["count"])]
+            channels.append((channel["target"], channel["data_path"], indices, [
+                get_binary_array(directory, buffer, offset, channel["count"])
+                for offset in channel["columns"]
+            ]))
+        vehicles.append({
+            "header": entry["header"],
+            "frametimes": get_binary_array(directory, buffer, entry["frametimes"], entry["count"]),
+            "channels": channels,
+        })
+    return vehicles
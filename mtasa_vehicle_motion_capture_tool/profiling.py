@@ -0,0 +1,66 @@
+"""Opt-in timing of where an import spends its time, without Blender."""
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+import json
+
+PROFILE_EXTENSION = ".profile.json"
+
+
+class ImportProfile:
+    """Wall time and call count per named phase, plus keyframes written per object.
+
+    Phase names are grouped with slashes, e.g. "setup/create_ped" or
+    "compute/wheels". A disabled profile records nothing, so it can be
+    passed around unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.start = perf_counter()
+        # name -> [seconds, calls]
+        self.phases = {}
+        # object name -> keyframes
+        self.keyframes = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, [0.0, 0])
+            entry[0] += perf_counter() - start
+            entry[1] += 1
+
+    def merge(self, phases: dict):
+        """Adds in phases recorded by another profile, e.g. one from a worker process."""
+        for name, (seconds, calls) in phases.items():
+            entry = self.phases.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def add_keyframes(self, name: str, count: int):
+        if self.enabled:
+            self.keyframes[name] = self.keyframes.get(name, 0) + count
+
+    def report(self, **info):
+        return {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "total_seconds": perf_counter() - self.start,
+            "info": info,
+            "phases": {name: {"seconds": seconds, "calls": calls}
+                       for name, (seconds, calls) in sorted(self.phases.items())},
+            "keyframes": dict(sorted(self.keyframes.items())),
+            "total_keyframes": sum(self.keyframes.values()),
+        }
+
+    def save(self, capturepath: str, **info):
+        """Writes the report as JSON next to the capture and returns its path."""
+        outpath = capturepath + PROFILE_EXTENSION
+        with open(outpath, "w") as reportfile:
+            json.dump(self.report(**info), reportfile, indent=2)
+        return outpath
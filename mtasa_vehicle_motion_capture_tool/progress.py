@@ -0,0 +1,58 @@
+"""Console and status bar progress for long imports, without Blender."""
+from sys import stdout
+from time import perf_counter
+
+# Console and status bar updates per second.
+PROGRESS_RATE = 10.0
+
+
+def draw_stdout_progress_bar(progress, include_percentage=False):
+    block = int(round(0.3*progress))
+    msg = "[{0}]".format("#"*block + "-"*(30-block))
+    if include_percentage:
+        if progress == 100:
+            msg += " DONE"
+        else:
+            msg += str(progress) + "%"
+    return msg
+
+
+class ProgressReporter:
+    """Redraws a progress bar at most PROGRESS_RATE times per second.
+
+    update() is cheap enough to call on every frame: it only writes to the
+    console, and calls callback with the percentage, once the time budget has
+    passed or the last step is reached. Quiet reporters never draw the bar,
+    for batch and background runs, but still print the final summary.
+    """
+
+    def __init__(self, total: int, callback=None, quiet: bool = False, rate: float = PROGRESS_RATE):
+        self.total = max(total, 1)
+        self.callback = callback
+        self.quiet = quiet
+        self.interval = 1.0 / rate
+        self.start = perf_counter()
+        self.last = None
+        self.frames = 0
+        self.keyframes = 0
+
+    def update(self, done: int, detail: str = ""):
+        now = perf_counter()
+        if done < self.total and self.last is not None and now - self.last < self.interval:
+            return
+        self.last = now
+        progress = int(done / self.total * 100.0)
+        if not self.quiet:
+            stdout.write("\r" + draw_stdout_progress_bar(progress) + "  " + str(done) + detail)
+            stdout.flush()
+        if self.callback is not None:
+            self.callback(progress)
+
+    def finish(self, label: str = "Imported"):
+        """Prints how much was done and how fast."""
+        elapsed = perf_counter() - self.start
+        if not self.quiet and self.last is not None:
+            stdout.write("\n")
+        rate = 1.0 / elapsed if elapsed > 0 else 0.0
+        print("{} {} frames ({} keyframes) in {:.2f}s: {:.0f} frames/s, {:.0f} keyframes/s.".format(
+            label, self.frames, self.keyframes, elapsed, self.frames * rate, self.keyframes * rate))
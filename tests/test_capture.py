@@ -0,0 +1,237 @@
+"""Checks capture reading against json.loads of the whole capture.
+
+Captures are written to a temporary directory plain, gzip and xz compressed
+and as .vmcb binary captures, and every way of reading them has to give the
+frames json.loads gives.
+
+    python -m unittest discover tests
+"""
+from contextlib import contextmanager
+import gzip
+import io
+import json
+import lzma
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from mtasa_vehicle_motion_capture_tool import capture, core
+
+# Frames per vehicle of the test captures.
+FRAMES = 120
+# Ways of writing the same capture out, as json.dumps() arguments.
+LAYOUTS = (
+    {"separators": (",", ":")},
+    {},
+    {"indent": 2},
+    {"indent": "\t", "separators": (" , ", " : ")},
+)
+
+
+def component(rand: random.Random):
+    return {key: rand.uniform(-180.0, 180.0) for key in ("pX", "pY", "pZ", "rX", "rY", "rZ")}
+
+
+def vehicle(rand: random.Random, model: str, frames: int = FRAMES):
+    """A small vehicle with the members a capture has, and strings the tokenizer has to get past."""
+    data = {"i": {"vN": model, "vT": "Automobile", "fC": frames, "kfPS": 50, "d": frames / 50,
+                  "pM": 'wm"y\\st [{', "note": "}]:,\"1\":"}}
+    for key in range(1, frames + 1):
+        frame = {key: component(rand) for key in ("v", "lf", "rf", "lb", "rb")}
+        frame["fT"] = 1000.0 / 50 + rand.uniform(-0.5, 0.5)
+        frame["V" if key % 3 else "l"] = rand.uniform(-1.0, 1.0)
+        frame["s"] = key % 2
+        frame["c"] = {"cX": rand.uniform(-1.0, 1.0), "fov": 70}
+        if key % 5:
+            frame["P"] = {"P": {"pX": -0.4}, "201": {"rX": rand.uniform(-5.0, 5.0)}, "n": "b\"o[n]e\\"}
+        data[str(key)] = frame
+    return data
+
+
+def make_capture(seed: int = 0, count: int = 3):
+    rand = random.Random(seed)
+    return [vehicle(rand, model) for model in ("infernus", "nrg500", "bmx")[:count]]
+
+
+def lead(frame: dict, keys=capture.LEAD_KEYS):
+    return {key: value for key, value in frame.items() if key in keys}
+
+
+@contextmanager
+def chunk_size(size: int):
+    """Has index_stream() and decompress() read size bytes at a time."""
+    saved = capture.DECOMPRESS_CHUNK
+    capture.DECOMPRESS_CHUNK = size
+    try:
+        yield
+    finally:
+        capture.DECOMPRESS_CHUNK = saved
+
+
+class IndexTest(unittest.TestCase):
+
+    def assertIndexed(self, vehicles, buffer, expected):
+        self.assertEqual(len(vehicles), len(expected))
+        for indexed, data in zip(vehicles, expected):
+            self.assertEqual(json.loads(buffer[indexed["start"]:indexed["end"]]), data)
+            self.assertEqual(indexed["header"], data["i"])
+            self.assertEqual(indexed["frames"], [key for key in data if key != "i"])
+            offsets = indexed["offsets"]
+            for position, key in enumerate(indexed["frames"]):
+                self.assertEqual(json.loads(buffer[offsets[2 * position]:offsets[2 * position + 1]]), data[key])
+
+    def test_index_capture(self):
+        expected = make_capture()
+        for layout in LAYOUTS:
+            buffer = json.dumps(expected, **layout).encode()
+            with self.subTest(layout=layout):
+                self.assertIndexed(capture.index_capture(buffer), buffer, expected)
+
+    def test_header_last(self):
+        expected = make_capture(1)
+        for data in expected:
+            data["i"] = data.pop("i")
+        buffer = json.dumps(expected).encode()
+        self.assertIndexed(capture.index_capture(buffer), buffer, expected)
+
+    def test_not_a_capture(self):
+        for buffer in (b"", b'{"i": {"vN": "infernus"}}', b"  \n", b"null"):
+            with self.subTest(buffer=buffer):
+                self.assertEqual(capture.index_capture(buffer), [])
+                self.assertEqual(capture.index_stream(io.BytesIO(buffer)), [])
+
+    def test_index_stream(self):
+        expected = make_capture(2, 2)
+        for layout in LAYOUTS:
+            buffer = json.dumps(expected, **layout).encode()
+            indexed = capture.index_capture(buffer)
+            # Chunk ends have to land inside strings, escapes and the space around colons.
+            for size in (1, 2, 3, 7, 64, 1000, len(buffer)):
+                with self.subTest(layout=layout, size=size), chunk_size(size):
+                    self.assertEqual(capture.index_stream(io.BytesIO(buffer)), indexed)
+
+    def test_scan_headers(self):
+        expected = make_capture(5)
+        headers = [data["i"] for data in expected]
+        for layout in LAYOUTS:
+            buffer = json.dumps(expected, **layout).encode()
+            with self.subTest(layout=layout):
+                self.assertEqual(capture.scan_headers(buffer), headers)
+                # The start of a compressed capture, cut off in and around each header:
+                # only the headers it holds whole.
+                starts = [start for start in range(len(buffer)) if buffer.startswith(b'"i"', start)]
+                self.assertEqual(len(starts), len(headers))
+                for count, start in enumerate(starts):
+                    for end in range(start - 2, start + 300):
+                        peeked = capture.scan_headers(buffer[:end])
+                        self.assertIn(len(peeked), (count, count + 1))
+                        self.assertEqual(peeked, headers[:len(peeked)])
+                    self.assertEqual(len(peeked), count + 1)
+        self.assertEqual(capture.scan_headers(b'{"i": {"vN": "infernus"}}'), [])
+
+    def test_decode_lead(self):
+        data = make_capture(3, 1)[0]
+        for layout in LAYOUTS:
+            for key, frame in data.items():
+                if key == "i":
+                    continue
+                chunk = json.dumps(frame, **layout).encode()
+                with self.subTest(layout=layout, frame=key):
+                    self.assertEqual(capture.decode_lead(chunk), lead(frame))
+                    pattern = capture.get_member_pattern(("fT", "c"))
+                    self.assertEqual(capture.decode_lead(chunk, pattern), lead(frame, ("fT", "c")))
+
+
+class CaptureFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.expected = make_capture(4)
+        self.filepath = self.write("take.json", open, {"indent": 1})
+
+    def write(self, name: str, opener, layout=None):
+        filepath = os.path.join(self.directory, name)
+        with opener(filepath, "wt") as capturefile:
+            json.dump(self.expected, capturefile, **(layout or {}))
+        return filepath
+
+    def test_compressed(self):
+        for filepath in (self.write("take.json.gz", gzip.open), self.write("take.vmc.xz", lzma.open)):
+            for size in (4096, capture.DECOMPRESS_CHUNK):
+                capture.capture_cache.clear()
+                with self.subTest(filepath=filepath, size=size), chunk_size(size):
+                    self.assertEqual(capture.get_capture(filepath)["headers"], [data["i"] for data in self.expected])
+                    for index, data in enumerate(self.expected):
+                        self.assertEqual(capture.load_vehicle(filepath, index), data)
+                        self.assertEqual(capture.load_frame(filepath, index, "7"), lead(data["7"]))
+
+    def test_peek_capture(self):
+        headers = [data["i"] for data in self.expected]
+        compressed = self.write("take.json.gz", gzip.open)
+        for filepath, size, partial in ((self.filepath, 1000, False), (compressed, 1 << 30, False),
+                                        (compressed, 1000, True)):
+            capture.capture_cache.clear()
+            capture.peek_cache.clear()
+            saved = capture.PEEK_SIZE
+            capture.PEEK_SIZE = size
+            try:
+                peeked = capture.peek_capture(filepath)
+            finally:
+                capture.PEEK_SIZE = saved
+            with self.subTest(filepath=filepath, size=size):
+                self.assertEqual(peeked["partial"], partial)
+                self.assertEqual(peeked["headers"], headers[:1] if partial else headers)
+                # Frames are only indexed on import.
+                self.assertNotIn(filepath, capture.capture_cache)
+
+    def test_load_vehicle_keys(self):
+        for index, data in enumerate(self.expected):
+            loaded = capture.load_vehicle(self.filepath, index, capture.LEAD_KEYS)
+            self.assertEqual(loaded, {key: frame if key == "i" else lead(frame) for key, frame in data.items()})
+
+    def assertRange(self, filepath: str, index: int, start: float, end: float, bytime: bool, keys=None):
+        """load_vehicle_range() has to pick the frames get_range_positions() does, renumbered from "1"."""
+        data = self.expected[index]
+        frames = [data[str(key)] for key in range(1, data["i"]["fC"] + 1)]
+        first, last = core.get_range_positions([frame["fT"] for frame in frames], start, end, bytime)
+        expected = {str(position + 1): lead(frame) if position < first or keys is not None else frame
+                    for position, frame in enumerate(frames[:last])}
+        expected["i"] = dict(data["i"], fC=last)
+        self.assertEqual(capture.load_vehicle_range(filepath, index, start, end, bytime, keys), (expected, first))
+
+    def test_load_vehicle_range(self):
+        ranges = (
+            (1, FRAMES, False), (1, 1, False), (30, 60, False), (60.5, 90.2, False),
+            (FRAMES, FRAMES + 50, False), (200, 300, False), (40, 10, False),
+            (0.0, 10.0, True), (0.5, 1.2, True), (0.3, 0.3, True), (2.0, 100.0, True), (50.0, 60.0, True),
+        )
+        for filepath in (self.filepath, self.write("take.json.gz", gzip.open)):
+            for index in range(len(self.expected)):
+                for start, end, bytime in ranges:
+                    with self.subTest(filepath=filepath, index=index, start=start, end=end, bytime=bytime):
+                        self.assertRange(filepath, index, start, end, bytime)
+        self.assertRange(self.filepath, 1, 30, 60, False, capture.LEAD_KEYS)
+
+    def test_binary_round_trip(self):
+        binary = capture.convert_capture(self.filepath)
+        self.assertEqual(capture.get_capture(binary)["headers"], [data["i"] for data in self.expected])
+        for index, data in enumerate(self.expected):
+            with self.subTest(index=index):
+                self.assertEqual(capture.load_vehicle(binary, index), data)
+                self.assertEqual(dict(capture.iter_frames(binary, index)),
+                                 dict(capture.iter_frames(self.filepath, index)))
+                self.assertEqual(capture.load_vehicle(binary, index, capture.LEAD_KEYS),
+                                 capture.load_vehicle(self.filepath, index, capture.LEAD_KEYS))
+                self.assertEqual(capture.load_vehicle_range(binary, index, 0.4, 1.5, True),
+                                 capture.load_vehicle_range(self.filepath, index, 0.4, 1.5, True))
+                self.assertEqual(capture.load_frame(binary, index, "9"), lead(data["9"]))
+                frames = capture.load_column_frames(binary, index)
+                self.assertEqual(len(frames), FRAMES)
+                self.assertEqual(list(frames.column("fT")), [data[str(key)]["fT"] for key in range(1, FRAMES + 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
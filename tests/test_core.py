@@ -0,0 +1,406 @@
+"""Checks the whole-take channel math in core against the per-frame functions it replaces.
+
+The reference functions below are copies of the MTAVEHMOCAP_OT_RunAction
+methods (addon.py needs Blender to import). Results have to agree bit for
+bit, on the NumPy path and on the plain Python fallback.
+
+    python -m unittest discover tests
+"""
+from array import array
+from contextlib import contextmanager
+from math import cos, floor, pi, sin, sqrt
+import random
+import unittest
+
+from mtasa_vehicle_motion_capture_tool import core
+
+# Samples per synthetic take, and takes per test.
+TAKE_LENGTH = 5000
+TAKES = 4
+
+
+def offsetrotationz(val, dic):
+    lastval = dic["z_history"]
+    if (val + 90.0) < lastval:
+        dic["angle_offset_z"] += 360.0
+    elif (val - 90.0) > lastval:
+        dic["angle_offset_z"] -= 360.0
+    dic["z_history"] = val
+    return val + dic["angle_offset_z"]
+
+
+def offsetrotationy(val, dic):
+    lastval = dic["y_history"]
+    if (val + 90.0) < lastval:
+        dic["angle_offset_y"] += 360.0
+    elif (val - 90.0) > lastval:
+        dic["angle_offset_y"] -= 360.0
+    dic["y_history"] = val
+    return val + dic["angle_offset_y"]
+
+
+def offsetrotationx(val, dic):
+    lastval = dic["x_history"]
+    if (val + 180.0) < lastval:
+        dic["angle_offset_x"] += 360.0
+    elif (val - 180.0) > lastval:
+        dic["angle_offset_x"] -= 360.0
+    dic["x_history"] = val
+    return val + dic["angle_offset_x"]
+
+
+def getvehicletraveldistance(framedata):
+    base = 0.02
+    if "V" in framedata:
+        velocity = framedata["V"]
+    else:
+        velocity = framedata["l"]
+    frametime = framedata["fT"] * 0.001
+    return frametime * velocity / base
+
+
+def getwheelrotations(dist, radius):
+    circonference = 2 * pi * radius
+    return dist / circonference
+
+
+def offsetrotationwheel(isleftside, val, dic, dist, wheelradius):
+    rotations = getwheelrotations(dist, wheelradius)
+    lastval = dic["x_history"]
+    if abs(rotations) >= 1.0:
+        dic["angle_offset_x"] += (360.0 * floor(rotations))
+        rotations -= floor(rotations)
+    if dist >= 0:
+        if val > lastval:
+            dic["angle_offset_x"] += (val - lastval)
+        elif val < lastval:
+            dic["angle_offset_x"] += 360.0 + (val - lastval)
+    elif dist < 0:
+        if val > lastval:
+            dic["angle_offset_x"] -= (val - lastval)
+        elif val < lastval:
+            dic["angle_offset_x"] -= (360.0 + (val - lastval))
+    dic["x_history"] = val
+    if isleftside:
+        return dic["angle_offset_x"]
+    else:
+        return -dic["angle_offset_x"]
+
+
+def keyframe_insert(keys, frame, value):
+    """One keyframe_insert(): replaces the key less than 0.01 frames away, or adds one."""
+    for position, (existing, _) in enumerate(keys):
+        if abs(existing - frame) < core.KEY_MERGE_THRESHOLD:
+            keys[position] = (frame, value)
+            return
+    keys.append((frame, value))
+    keys.sort(key=lambda key: key[0])
+
+
+def float32(values):
+    """Values as Blender stores keyframe coordinates."""
+    return list(array("f", values))
+
+
+def history():
+    return {
+        "angle_offset_x": 0.0,
+        "angle_offset_y": 0.0,
+        "angle_offset_z": 0.0,
+        "x_history": 0.0,
+        "y_history": 0.0,
+        "z_history": 0.0,
+    }
+
+
+def angles(rand: random.Random, limit: float):
+    """A take of angles in [-limit, limit) that keep wrapping around, with parked stretches."""
+    values = []
+    angle = rand.uniform(-limit, limit)
+    step = 0.0
+    for position in range(TAKE_LENGTH):
+        if position % 200 == 0:
+            step = rand.choice((0.0, rand.uniform(-30.0, 30.0)))
+        angle = (angle + step + rand.uniform(-1.0, 1.0) + limit) % (2 * limit) - limit
+        values.append(angle)
+    return values
+
+
+def frames(rand: random.Random):
+    """Speed and frame time samples, forwards, backwards, parked and fast."""
+    samples = []
+    speed = 0.0
+    for position in range(TAKE_LENGTH):
+        if position % 300 == 0:
+            speed = rand.choice((0.0, rand.uniform(-1.0, 1.0), rand.uniform(2.0, 12.0)))
+        frame = {"fT": 1000.0 / 50 + rand.uniform(-0.5, 0.5)}
+        frame["V" if position % 7 else "l"] = speed
+        samples.append(frame)
+    return samples
+
+
+@contextmanager
+def numpy_path(enabled: bool):
+    """Runs core on its NumPy path, or on the plain Python fallback."""
+    saved = core.numpy
+    if not enabled:
+        core.numpy = None
+    try:
+        yield
+    finally:
+        core.numpy = saved
+
+
+class BatchMathTest(unittest.TestCase):
+
+    def paths(self):
+        yield False
+        if core.numpy is not None:
+            yield True
+
+    def assertSameFloats(self, result, expected):
+        self.assertEqual([float(value) for value in result], expected)
+
+    def test_unwrap(self):
+        rand = random.Random(1)
+        references = (
+            (offsetrotationx, core.UNWRAP_THRESHOLD_X, 180.0),
+            (offsetrotationy, core.UNWRAP_THRESHOLD_YZ, 90.0),
+            (offsetrotationz, core.UNWRAP_THRESHOLD_YZ, 180.0),
+        )
+        for _ in range(TAKES):
+            for reference, threshold, limit in references:
+                values = angles(rand, limit)
+                dic = history()
+                expected = [reference(value, dic) for value in values]
+                for enabled in self.paths():
+                    with self.subTest(reference=reference.__name__, numpy=enabled), numpy_path(enabled):
+                        self.assertSameFloats(core.unwrap(values, threshold), expected)
+
+    def test_unwrap_empty(self):
+        for enabled in self.paths():
+            with numpy_path(enabled):
+                self.assertEqual(len(core.unwrap([], core.UNWRAP_THRESHOLD_X)), 0)
+
+    def test_travel_distances(self):
+        samples = frames(random.Random(2))
+        expected = [getvehicletraveldistance(frame) for frame in samples]
+        speeds = core.get_speeds(samples)
+        frametimes = core.get_column_values(samples, "fT")
+        for enabled in self.paths():
+            with self.subTest(numpy=enabled), numpy_path(enabled):
+                self.assertSameFloats(core.travel_distances(speeds, frametimes), expected)
+
+    def test_spin_wheels(self):
+        rand = random.Random(3)
+        for _ in range(TAKES):
+            samples = frames(rand)
+            dists = [getvehicletraveldistance(frame) for frame in samples]
+            wheels = {}
+            expected = {}
+            for name, radius, isleftside in (("lf", 0.34, True), ("rf", 0.34, False),
+                                             ("lb", rand.uniform(0.2, 0.6), True), ("rb", 0.05, False)):
+                values = angles(rand, 180.0)
+                wheels[name] = (values, radius, isleftside)
+                dic = history()
+                expected[name] = [offsetrotationwheel(isleftside, value, dic, dist, radius)
+                                  for value, dist in zip(values, dists)]
+            for enabled in self.paths():
+                with numpy_path(enabled):
+                    spun = core.spin_wheels(dists, wheels)
+                for name in wheels:
+                    with self.subTest(wheel=name, numpy=enabled):
+                        self.assertSameFloats(spun[name], expected[name])
+
+    def test_spin_wheels_none(self):
+        self.assertEqual(core.spin_wheels([1.0, 2.0], {}), {})
+
+
+
+class MergeKeysTest(unittest.TestCase):
+
+    def existing(self, frames, values):
+        return [c for key in zip(float32(frames), float32(values)) for c in key]
+
+    def test_replaces_float32_keys(self):
+        frames = core.frame_times([1000.0 / 50] * 500, 1000 / 24, 1.0)
+        co = self.existing(frames, [0.0] * 500)
+        values = [float(position) for position in range(500)]
+        merged = core.merge_keys(co, frames, values)
+        self.assertEqual(merged[0::2], frames)
+        self.assertEqual(merged[1::2], values)
+
+    def test_matches_keyframe_insert(self):
+        rand = random.Random(4)
+        for _ in range(20):
+            # An earlier import, and one at another rate or over another range.
+            oldframes = core.frame_times([20.0 + rand.uniform(-0.5, 0.5) for _ in range(80)], 1000 / 24, 1.0)
+            co = self.existing(oldframes, [rand.uniform(-1.0, 1.0) for _ in oldframes])
+            frames = []
+            for frame, following in zip(oldframes, oldframes[1:]):
+                if rand.random() < 0.6:
+                    frames.append(frame + rand.uniform(-0.009, 0.009))
+                if rand.random() < 0.3:
+                    frames.append((frame + following) / 2)
+            rand.shuffle(frames)
+            values = [rand.uniform(-1.0, 1.0) for _ in frames]
+            keys = list(zip(co[0::2], co[1::2]))
+            for frame, value in zip(frames, values):
+                keyframe_insert(keys, frame, value)
+            merged = core.merge_keys(co, frames, values)
+            self.assertEqual(len(merged) // 2, len(keys))
+            self.assertEqual(merged, [c for key in keys for c in key])
+
+    def test_later_key_wins(self):
+        self.assertEqual(core.merge_keys([], [2.0, 2.004, 5.0], [1.0, 2.0, 3.0]), [2.004, 2.0, 5.0, 3.0])
+
+
+def interpolate(times, column, kept, position):
+    """The value linear interpolation between the kept samples around position gives."""
+    following = next(index for index in kept if index >= position)
+    preceding = max(index for index in kept if index <= position)
+    if following == preceding:
+        return column[position]
+    factor = (times[position] - times[preceding]) / (times[following] - times[preceding])
+    return column[preceding] + (column[following] - column[preceding]) * factor
+
+
+def quaternions(rand: random.Random, count: int):
+    """Unit (w, x, y, z) columns that wander about, flipping sign now and then as captures do."""
+    columns = [[], [], [], []]
+    angle = 0.0
+    for position in range(count):
+        angle += rand.uniform(-0.3, 0.3)
+        axis = [rand.uniform(0.9, 1.0), rand.uniform(-0.1, 0.1), rand.uniform(-0.1, 0.1)]
+        length = sqrt(sum(value * value for value in axis))
+        q = [cos(angle / 2)] + [sin(angle / 2) * value / length for value in axis]
+        if position % 17 == 5:
+            q = [-value for value in q]
+        for column, value in zip(columns, q):
+            column.append(value)
+    return columns
+
+
+class SimplifyTest(unittest.TestCase):
+
+    def paths(self):
+        yield False
+        if core.numpy is not None:
+            yield True
+
+    def test_tolerance(self):
+        rand = random.Random(5)
+        # Long enough for the NumPy path to take over on the first spans.
+        count = core.SIMPLIFY_NUMPY_SPAN * 8
+        times = core.frame_times([20.0 + rand.uniform(-0.5, 0.5) for _ in range(count)], 1000 / 24, 1.0)
+        columns = [angles(rand, 180.0)[:count], [0.0] * count, [position * 0.5 for position in range(count)]]
+        for tolerance in (0.0, 0.01, 1.0, 25.0):
+            results = []
+            for enabled in self.paths():
+                with self.subTest(tolerance=tolerance, numpy=enabled), numpy_path(enabled):
+                    kept = core.simplify(times, columns, tolerance)
+                    results.append(kept)
+                    self.assertEqual(kept[0], 0)
+                    self.assertEqual(kept[-1], count - 1)
+                    self.assertEqual(kept, sorted(set(kept)))
+                    for column in columns:
+                        for position in range(count):
+                            self.assertLessEqual(abs(interpolate(times, column, kept, position) - column[position]),
+                                                 tolerance + 1e-9)
+            self.assertEqual(results[0], results[-1])
+
+    def test_lines_keep_their_ends(self):
+        times = [position * 0.8 for position in range(200)]
+        for enabled in self.paths():
+            with self.subTest(numpy=enabled), numpy_path(enabled):
+                self.assertEqual(core.simplify(times, [[2.0 * time - 3.0 for time in times], [1.5] * 200], 1e-6), [0, 199])
+                self.assertEqual(core.simplify(times[:2], [[0.0, 5.0]], 0.1), [0, 1])
+                self.assertEqual(core.simplify([], [[]], 0.1), [])
+
+    def test_decimate_channels(self):
+        times = [float(position) for position in range(10)]
+        channels = [
+            ("veh", "location", None, [[0.0] * 10, [float(position) for position in range(10)], [0.0] * 5 + [1.0] * 5]),
+            ("camera", "lens", [1, 3, 5, 7], [[10.0, 10.0, 10.0, 10.0]]),
+        ]
+        decimated, before, after = core.decimate_channels(channels, times, 0.001, 0.1)
+        self.assertEqual(decimated, [
+            ("veh", "location", [0, 4, 5, 9], [[0.0] * 4, [0.0, 4.0, 5.0, 9.0], [0.0, 0.0, 1.0, 1.0]]),
+            ("camera", "lens", [1, 7], [[10.0, 10.0]]),
+        ])
+        self.assertEqual((before, after), (34, 14))
+
+
+class ResampleTest(unittest.TestCase):
+
+    def paths(self):
+        yield False
+        if core.numpy is not None:
+            yield True
+
+    def test_grid(self):
+        self.assertEqual(core.resample_grid([0.0, 0.7, 2.1, 3.0], 1), [0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(core.resample_grid([0.5, 1.6], 4), [0.5, 0.75, 1.0, 1.25, 1.5])
+        self.assertEqual(core.resample_grid([], 2), [])
+
+    def test_linear(self):
+        rand = random.Random(6)
+        times = core.frame_times([20.0 + rand.uniform(-0.5, 0.5) for _ in range(300)], 1000 / 24, 1.0)
+        channels = [
+            ("veh", "location", None, [[3.0 * time + 1.0 for time in times], [-time for time in times]]),
+            ("camera", "lens", [10, 11, 40, 41], [[35.0, 35.0, 50.0, 50.0]]),
+        ]
+        for subframes in (1, 2, 5):
+            for enabled in self.paths():
+                with self.subTest(subframes=subframes, numpy=enabled), numpy_path(enabled):
+                    grid, resampled = core.resample_channels(channels, times, subframes)
+                    self.assertAlmostEqual(grid[1] - grid[0], 1.0 / subframes)
+                    target, data_path, indices, columns = resampled[0]
+                    self.assertEqual((target, data_path, indices), ("veh", "location", None))
+                    self.assertEqual(len(columns[0]), len(grid))
+                    for time, x, y in zip(grid, columns[0], columns[1]):
+                        self.assertAlmostEqual(x, 3.0 * time + 1.0, places=9)
+                        self.assertAlmostEqual(y, -time, places=9)
+                    # The lens only covers the grid between its own first and last keys.
+                    _, _, indices, columns = resampled[1]
+                    self.assertEqual([grid[index] for index in indices],
+                                     [time for time in grid if times[10] <= time <= times[41]])
+                    self.assertTrue(all(35.0 <= value <= 50.0 for value in columns[0]))
+
+    def test_ped_euler_unwrapped(self):
+        times = [0.0, 1.0, 2.0]
+        channels = [("ped:1", "rotation_euler", None, [[3.0, -3.0, 3.0]]),
+                    ("veh", "rotation_euler", None, [[3.0, -3.0, 3.0]])]
+        _, resampled = core.resample_channels(channels, times, 2)
+        self.assertAlmostEqual(resampled[0][3][0][1], 3.0 + (2 * pi - 6.0) / 2)
+        self.assertAlmostEqual(resampled[1][3][0][1], 0.0)
+
+    def test_slerp(self):
+        rand = random.Random(7)
+        columns = quaternions(rand, 200)
+        positions = [rand.randrange(199) for _ in range(500)]
+        factors = [rand.choice((0.0, 1.0, rand.random())) for _ in positions]
+        results = []
+        for enabled in self.paths():
+            with self.subTest(numpy=enabled), numpy_path(enabled):
+                resampled = [list(column) for column in core.slerp_columns(columns, positions, factors)]
+                results.append(resampled)
+                for index, (position, factor) in enumerate(zip(positions, factors)):
+                    q = [column[index] for column in resampled]
+                    start = [column[position] for column in columns]
+                    end = [column[position + 1] for column in columns]
+                    self.assertAlmostEqual(sum(value * value for value in q), 1.0)
+                    # Along the shorter arc: never further from either end than they are from each other.
+                    between = abs(sum(a * b for a, b in zip(start, end)))
+                    self.assertGreaterEqual(abs(sum(a * b for a, b in zip(q, start))), between - 1e-9)
+                    self.assertGreaterEqual(abs(sum(a * b for a, b in zip(q, end))), between - 1e-9)
+                    if factor == 0.0:
+                        for value, expected in zip(q, start):
+                            self.assertAlmostEqual(value, expected)
+        for python, vectorized in zip(results[0], results[-1]):
+            for a, b in zip(python, vectorized):
+                self.assertAlmostEqual(a, b)
+
+
+if __name__ == "__main__":
+    unittest.main()